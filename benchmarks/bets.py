@@ -0,0 +1,93 @@
+"""Bet ledger benchmark for --all-bets.
+
+Fills a temporary ledger with synthetic settled and open bets and reports
+the time Betting.view_bets takes to list all of them.
+
+    python benchmarks/bets.py [--bets 100000] [--runs 3]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+)
+
+import ledger  # noqa: E402
+from betting import Betting  # noqa: E402
+
+
+class Config(object):
+    """The part of ConfigHandler that Betting.view_bets needs."""
+
+    def __init__(self, filename):
+        self.filename = filename
+
+    def get(self, section, value):
+        return self.filename
+
+
+def fill(bet_ledger, count):
+    rng = random.Random(42)
+    with bet_ledger.transaction() as connection:
+        for bet_id in range(1, count + 1):
+            status = "open" if bet_id % 10 == 0 else "closed"
+            connection.execute(
+                ledger.INSERT_BET,
+                (
+                    str(bet_id),
+                    rng.choice("1X2"),
+                    500,
+                    1000,
+                    "2.00",
+                    f"Home {bet_id}",
+                    f"Away {bet_id}",
+                    "01-05 20:00",
+                    "01-05-2024 12:00:00",
+                    1714500000 + bet_id * 60,
+                    status,
+                ),
+            )
+            if status == "closed":
+                correct = rng.random() < 0.4
+                connection.execute(
+                    "INSERT INTO settlements (bet_id, result, correct, payout) "
+                    "VALUES (?, ?, ?, ?)",
+                    (bet_id, rng.choice("1X2"), correct, 1000 if correct else 0),
+                )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bets", type=int, default=100000)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "ledger.db")
+        betting = Betting(None, None, None, None, Config(filename))
+        fill(betting.ledger, args.bets)
+
+        timings = []
+        for _ in range(args.runs):
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                betting.view_bets("open")
+                betting.view_bets("closed")
+                timings.append(time.perf_counter() - start)
+        betting.ledger.connection.close()
+
+    print(
+        f"--all-bets with {args.bets} bets: {statistics.median(timings) * 1000:.0f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""Concurrency check for bets and the balance.
+
+Starts several processes that each place bets and settle every finished
+bet at the same time, all on the same config.ini and bet ledger in a
+temporary directory, then checks that no bet or balance update got lost.
+Match results come from a stand-in for the API, so no API key is needed.
+
+    python benchmarks/concurrency.py [--processes 8] [--bets 25]
+"""
+
+import argparse
+import contextlib
+import io
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+)
+
+from fixture import Fixture  # noqa: E402
+
+# amounts in cents
+OPENING_BALANCE = 100000
+STAKE = 100
+PAYOUT = 200
+
+CONFIG = f"""[auth]
+api_token = none
+backend = api-football
+
+[profile]
+name = concurrency
+balance = {OPENING_BALANCE // 100}.00
+timezone = Europe/Amsterdam
+date_format = d-m-Y
+
+[betting_files]
+open_bets = betting_files/open_bets.csv
+closed_bets = betting_files/closed_bets.csv
+balance_history = betting_files/balance_history.csv
+ledger = betting_files/ledger.db
+"""
+
+
+class Results(object):
+    """Reports every match as finished 1-0."""
+
+    @staticmethod
+    def get_match_results(match_ids):
+        fixtures = [
+            Fixture(
+                {
+                    "id": int(match_id),
+                    "state_id": 5,
+                    "scores": [
+                        {
+                            "description": "CURRENT",
+                            "score": {"participant": "home", "goals": 1},
+                        },
+                        {
+                            "description": "CURRENT",
+                            "score": {"participant": "away", "goals": 0},
+                        },
+                    ],
+                }
+            )
+            for match_id in match_ids
+        ]
+        return fixtures, []
+
+
+def make_betting():
+    from betting import Betting
+    from config_handler import ConfigHandler
+    from writers import get_writer
+
+    return Betting(None, None, get_writer(), Results(), ConfigHandler())
+
+
+def worker(process, bets):
+    betting = make_betting()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for bet in range(bets):
+            match = Fixture(
+                {"id": process * 10000 + bet, "starting_at": "2024-05-01 20:00:00"}
+            )
+            # predict a home win for every other bet, so half of them pay out
+            prediction = "1" if bet % 2 else "2"
+            betting.save_bet(
+                prediction, STAKE, PAYOUT, "2.00", match, "01-05-2024 12:00:00"
+            )
+            betting.check_open_bets()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--processes", type=int, default=8)
+    parser.add_argument("--bets", type=int, default=25)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        os.makedirs("betting_files")
+        with open("config.ini", "w") as f:
+            f.write(CONFIG)
+
+        # creates the ledger and records the opening balance
+        make_betting().main()
+
+        start = time.perf_counter()
+        processes = [
+            multiprocessing.Process(target=worker, args=(process, args.bets))
+            for process in range(args.processes)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        elapsed = time.perf_counter() - start
+
+        betting = make_betting()
+        with contextlib.redirect_stdout(io.StringIO()):
+            betting.check_open_bets()
+        placed = args.processes * args.bets
+        won = args.processes * (args.bets // 2)
+        expected = OPENING_BALANCE - placed * STAKE + won * PAYOUT
+        balance = betting.get_balance()
+        connection = betting.ledger.connection
+        closed = connection.execute("SELECT COUNT(*) FROM settlements").fetchone()[0]
+        events = connection.execute("SELECT SUM(amount) FROM balance_events")
+        replayed = events.fetchone()[0]
+        connection.close()
+        os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    print(
+        f"{args.processes} processes placed {placed} bets in {elapsed:.2f} s, "
+        f"{closed} settled"
+    )
+    print(f"balance {balance}, replayed {replayed}, expected {expected} (cents)")
+    if closed != placed or balance != expected or replayed != expected:
+        sys.exit("Lost or duplicated updates")
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Payload size per view of the Sportmonks fixture requests.
+
+Fetches the first page of the fixtures of every view twice, once with the
+includes that were requested for every view before they were trimmed and
+once with the includes the view asks for now, and prints the
+size of both responses as a Markdown table, ready for the README. Needs a
+Sportmonks API token, taken from --token or from config.ini in the current
+directory.
+
+    python benchmarks/payload.py [--token TOKEN]
+"""
+
+import argparse
+import configparser
+import datetime
+import os
+import sys
+
+import requests
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+)
+
+from sportmonks_handler import SportmonksHandler  # noqa: E402
+
+# The includes every view requested before they were chosen per view
+UNTRIMMED_INCLUDE = "participants;league;round;events;stage;scores;periods"
+
+
+def views():
+    today = datetime.date.today()
+    between = f"fixtures/between/{today}/{today}"
+    week = f"fixtures/between/{today}/{today + datetime.timedelta(days=7)}"
+    # (view, url, show_odds, show_details, show_minute)
+    return [
+        ("--today", between, False, False, False),
+        ("--today --details", between, False, True, False),
+        ("--today --odds", between, True, False, False),
+        ("--live", "livescores/latest", False, False, True),
+        ("--live --details", "livescores/latest", False, True, True),
+        ("--matches --days 7", week, False, False, False),
+    ]
+
+
+def payload_size(session, url, params):
+    req = session.get(SportmonksHandler.BASE_URL + url, params=params, timeout=30)
+    req.raise_for_status()
+    return len(req.content), len(req.json().get("data") or [])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--token")
+    args = parser.parse_args()
+
+    token = args.token
+    if token is None:
+        config = configparser.ConfigParser()
+        config.read("config.ini")
+        token = config.get("auth", "api_token", fallback=None)
+    if not token:
+        sys.exit("No API token, pass --token or run from a directory with config.ini")
+
+    session = requests.Session()
+    print("| View | Fixtures | Before | After | Saved |")
+    print("| --- | ---: | ---: | ---: | ---: |")
+    for view, url, show_odds, show_details, show_minute in views():
+        before = {"api_token": token, "include": UNTRIMMED_INCLUDE}
+        if show_odds:
+            before["include"] += ";odds"
+            before["markets"] = "1"
+        after = {"api_token": token}
+        after.update(
+            SportmonksHandler.fixture_params(show_odds, show_details, show_minute)
+        )
+        before_size, fixtures = payload_size(session, url, before)
+        after_size, _ = payload_size(session, url, after)
+        saved = 1 - after_size / before_size if before_size else 0
+        print(
+            f"| `{view}` | {fixtures} | {before_size:,} B | {after_size:,} B "
+            f"| {saved:.0%} |"
+        )
+
+
+if __name__ == "__main__":
+    main()
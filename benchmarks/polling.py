@@ -0,0 +1,168 @@
+"""Check that a --refresh loop keeps polling while hidden matches are live.
+
+Runs the fixtures views of both handlers against stand-in API responses in
+a temporary directory and checks the poll delay they lead to:
+
+- --today --refresh hides live matches but must keep polling while they
+  are still being played, even when every match it shows has finished.
+- --live --refresh hides finished matches but must stop once every match
+  has finished.
+
+No API key is needed.
+
+    python benchmarks/polling.py
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+from collections import namedtuple
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+)
+
+CONFIG = """[auth]
+api_token = none
+backend = api-football
+
+[profile]
+name = polling
+balance = 1000.00
+timezone = Europe/Amsterdam
+date_format = d-m-Y
+
+[betting_files]
+open_bets = betting_files/open_bets.csv
+closed_bets = betting_files/closed_bets.csv
+balance_history = betting_files/balance_history.csv
+ledger = betting_files/ledger.db
+"""
+
+Parameters = namedtuple(
+    "parameters",
+    "url, msg, league_name, sort_by, days, "
+    "show_details, show_odds, not_started, refresh, place_bet, date_format, type_sort",
+)
+
+LEAGUE_ID = 1
+
+# (API-Football status, Sportmonks state id) of every stand-in match
+LIVE = ("2H", 4)
+FINISHED = ("FT", 5)
+
+
+def api_football_item(fixture_id, status):
+    return {
+        "fixture": {
+            "id": fixture_id,
+            "status": {"short": status[0]},
+            "timestamp": 1714500000,
+            "date": "2024-05-01T20:00:00+00:00",
+        },
+        "league": {
+            "id": LEAGUE_ID,
+            "name": "League",
+            "country": "Country",
+            "season": 2024,
+            "round": "Regular Season - 1",
+        },
+        "teams": {"home": {"id": 1, "name": "Home"}, "away": {"id": 2, "name": "Away"}},
+        "goals": {"home": 1, "away": 0},
+        "score": {},
+    }
+
+
+def sportmonks_item(fixture_id, status):
+    return {
+        "id": fixture_id,
+        "state_id": status[1],
+        "starting_at": "2024-05-01 20:00:00",
+        "starting_at_timestamp": 1714500000,
+        "league_id": LEAGUE_ID,
+        "league": {"id": LEAGUE_ID, "name": "League", "country_id": 1},
+        "round": {"name": 1},
+        "stage": {"name": "Regular Season"},
+        "participants": [
+            {"id": 1, "name": "Home", "meta": {"location": "home"}},
+            {"id": 2, "name": "Away", "meta": {"location": "away"}},
+        ],
+        "scores": [],
+    }
+
+
+def make_handler(backend, statuses):
+    """Return a handler of the backend whose API returns matches with the
+    given statuses, whatever is asked for."""
+    from api_football_handler import ApiFootballHandler
+    from config_handler import ConfigHandler
+    from sportmonks_handler import SportmonksHandler
+    from writers import get_writer
+
+    config_handler = ConfigHandler()
+    if backend == "api-football":
+        handler = ApiFootballHandler({}, None, get_writer(), config_handler, False)
+        items = [api_football_item(i, status) for i, status in enumerate(statuses)]
+        handler._get = lambda endpoint, params=None, fresh=False: list(items)
+    else:
+        handler = SportmonksHandler({}, None, get_writer(), config_handler, False)
+        items = [sportmonks_item(i, status) for i, status in enumerate(statuses)]
+        handler._get = lambda url, params=None, fresh=False: list(items)
+    return handler
+
+
+def next_delay(backend, type_sort, statuses):
+    import convert
+    from poll_scheduler import PollScheduler
+
+    handler = make_handler(backend, statuses)
+    parameters = Parameters(
+        "livescores/latest" if type_sort == "live" else "livescores",
+        ["No matches", "There was a problem"],
+        None,
+        "league",
+        1,
+        False,
+        False,
+        False,
+        True,
+        False,
+        convert.format_date("d-m-Y"),
+        type_sort,
+    )
+    with contextlib.redirect_stdout(io.StringIO()):
+        fixtures = handler.get_match_data(parameters, "2024-05-01", "2024-05-01")
+    return PollScheduler(handler.config_handler).next_delay(fixtures)
+
+
+def main():
+    import convert
+
+    convert.LEAGUES.add("L", [LEAGUE_ID], "League")
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        os.makedirs("betting_files")
+        with open("config.ini", "w") as f:
+            f.write(CONFIG)
+
+        failures = []
+        for backend in ("api-football", "sportmonks"):
+            delay = next_delay(backend, "today", [FINISHED, LIVE])
+            print(f"{backend} --today, live match hidden: next poll in {delay} s")
+            if delay is None:
+                failures.append(f"{backend} --today stopped while a match is live")
+            delay = next_delay(backend, "live", [FINISHED, FINISHED])
+            print(f"{backend} --live, every match finished: next poll in {delay} s")
+            if delay is not None:
+                failures.append(f"{backend} --live kept polling finished matches")
+        os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    if failures:
+        sys.exit("\n".join(failures))
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""Render benchmark for writers.Stdout.league_scores.
+
+Renders synthetic fixtures, as the Fixture records the handlers build, into
+an in-memory stream and reports the render time and the peak memory
+allocated while rendering. With --bets, renders the --open-bets view instead,
+with that many bets spread over the fixtures.
+
+    python benchmarks/render.py [--fixtures 10000] [--bets 0] [--runs 3]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from collections import namedtuple
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+)
+
+import convert  # noqa: E402
+from fixture import Fixture  # noqa: E402
+from writers import get_writer  # noqa: E402
+
+Parameters = namedtuple(
+    "parameters",
+    "url, msg, league_name, sort_by, days, "
+    "show_details, show_odds, not_started, refresh, place_bet, date_format, type_sort",
+)
+
+LEAGUES = 50
+STATE_IDS = [1, 1, 1, 2, 3, 5, 5, 5, 5, 18]
+
+
+def make_fixtures(count):
+    rng = random.Random(42)
+    for league_id in range(1, LEAGUES + 1):
+        convert.LEAGUES.add(f"L{league_id}", [league_id], f"League {league_id}")
+    fixtures = []
+    for fixture_id in range(1, count + 1):
+        league_id = rng.randint(1, LEAGUES)
+        home_goals, away_goals = rng.randint(0, 4), rng.randint(0, 4)
+        fixtures.append(
+            Fixture(
+                {
+                    "id": fixture_id,
+                    "state_id": rng.choice(STATE_IDS),
+                    "starting_at": f"2024-05-{rng.randint(1, 28):02d} 20:00:00",
+                    "starting_at_timestamp": 1714500000 + fixture_id * 60,
+                    "minute": 63,
+                    "extra_minute": None,
+                    "league_id": league_id,
+                    "league": {
+                        "id": league_id,
+                        "name": f"League {league_id}",
+                        "country_id": league_id,
+                        "season": 2023,
+                    },
+                    "participants": [
+                        {
+                            "id": 1,
+                            "name": f"Home {fixture_id}",
+                            "meta": {"location": "home"},
+                        },
+                        {
+                            "id": 2,
+                            "name": f"Away {fixture_id}",
+                            "meta": {"location": "away"},
+                        },
+                    ],
+                    "scores": [
+                        {
+                            "description": "CURRENT",
+                            "score": {"participant": "home", "goals": home_goals},
+                        },
+                        {
+                            "description": "CURRENT",
+                            "score": {"participant": "away", "goals": away_goals},
+                        },
+                    ],
+                    "round": {"name": rng.randint(1, 34)},
+                    "stage": {"name": "Regular Season"},
+                    "events": [
+                        {
+                            "id": event_id,
+                            "type_id": 14,
+                            "minute": rng.randint(1, 90),
+                            "player_name": f"Player {event_id}",
+                            "participant_id": 1 if event_id <= home_goals else 2,
+                        }
+                        for event_id in range(1, home_goals + away_goals + 1)
+                    ],
+                    "odds": [
+                        {"label": "1", "value": "2.10"},
+                        {"label": "X", "value": "3.40"},
+                        {"label": "2", "value": "3.25"},
+                    ],
+                    "periods": [],
+                }
+            )
+        )
+    return fixtures
+
+
+def make_bets(fixtures, count):
+    """Return the bets by match id, in the shape of the ledger rows."""
+    rng = random.Random(42)
+    bets = {}
+    for bet_id in range(1, count + 1):
+        fixture = rng.choice(fixtures)
+        bets.setdefault(fixture.id, []).append(
+            {
+                "id": bet_id,
+                "match_id": str(fixture.id),
+                "prediction": rng.choice(["1", "X", "2"]),
+                "stake": 1000,
+                "potential_wins": 2100,
+                "odd": "2.10",
+            }
+        )
+    return bets
+
+
+def render(writer, fixtures, parameters, bets=None):
+    stream = io.StringIO()
+    with contextlib.redirect_stdout(stream):
+        writer.league_scores(fixtures, parameters, True, bets)
+    return stream.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fixtures", type=int, default=10000)
+    parser.add_argument("--bets", type=int, default=0)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    fixtures = make_fixtures(args.fixtures)
+    bets = make_bets(fixtures, args.bets) if args.bets else None
+    parameters = Parameters(
+        "fixtures/multi" if bets else "fixtures/between/",
+        None,
+        None,
+        "date" if bets else "league",
+        7,
+        True,
+        True,
+        False,
+        bool(bets),
+        None if bets else False,
+        convert.format_date("d-m-Y"),
+        "watch_bets" if bets else "matches",
+    )
+    writer = get_writer()
+
+    timings = []
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        output = render(writer, fixtures, parameters, bets)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    render(writer, fixtures, parameters, bets)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    lines = output.count("\n")
+    seconds = statistics.median(timings)
+    print(f"fixtures:     {args.fixtures}")
+    if bets:
+        print(f"bets:         {args.bets}")
+    print(f"render time:  {seconds * 1000:.1f} ms (median of {args.runs})")
+    print(f"peak memory:  {peak / 1024 / 1024:.1f} MiB")
+    print(f"output lines: {lines} ({lines / seconds:,.0f} lines/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Startup-time benchmark for the commands that don't need the API.
+
+Every command runs a few times in a scratch directory with a throw-away
+config.ini. The script reports the median wall time and the import time
+measured with python -X importtime, plus which heavy modules got loaded.
+
+    python benchmarks/startup.py [--runs 5]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+COMMANDS = [
+    ["--help"],
+    ["--profile"],
+    ["--all-bets"],
+    ["--open-bets"],
+    ["--closed-bets"],
+]
+
+HEAVY_MODULES = ["matplotlib", "requests", "urllib3"]
+
+CONFIG = """[auth]
+api_token = benchmark
+backend = api-football
+
+[profile]
+name = benchmark
+balance = 100.00
+timezone = Europe/Amsterdam
+date_format = d-m-Y
+
+[betting_files]
+open_bets = betting_files/open_bets.csv
+closed_bets = betting_files/closed_bets.csv
+balance_history = betting_files/balance_history.csv
+"""
+
+
+def run(command, cwd):
+    """Run one command, return (wall seconds, import microseconds, modules)."""
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", os.path.join(SRC, "bettingbook.py")]
+        + command,
+        cwd=cwd,
+        env=dict(os.environ, PYTHONPATH=SRC),
+        capture_output=True,
+        text=True,
+    )
+    wall = time.perf_counter() - start
+    import_us = 0
+    modules = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        modules.add(name.strip().split(".")[0])
+        # Nested imports are indented, the cumulative time of a top-level
+        # import already includes them
+        if not name.startswith("   "):
+            import_us += int(cumulative)
+    return wall, import_us, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as cwd:
+        with open(os.path.join(cwd, "config.ini"), "w") as f:
+            f.write(CONFIG)
+        os.makedirs(os.path.join(cwd, "betting_files"))
+        print(f"{'COMMAND':20} {'WALL (ms)':>10} {'IMPORTS (ms)':>13}  HEAVY MODULES")
+        for command in COMMANDS:
+            results = [run(command, cwd) for _ in range(args.runs)]
+            wall = statistics.median(r[0] for r in results) * 1000
+            imports = statistics.median(r[1] for r in results) / 1000
+            heavy = sorted(m for m in HEAVY_MODULES if m in results[0][2])
+            print(
+                f"{' '.join(command):20} {wall:>10.1f} {imports:>13.1f}  "
+                f"{', '.join(heavy) or '-'}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -7,11 +7,18 @@ import time
 import convert
 from exceptions import APIErrorException
 from betting import Betting
+from session_handler import SessionHandler
+from poll_scheduler import PollScheduler
+from cache_handler import CacheHandler
+from fixture import Fixture, split_shown
 
 
 class ApiFootballHandler(object):
     BASE_URL = "https://v3.football.api-sports.io/"
 
+    # Maximum number of fixture IDs accepted by fixtures?ids=
+    MAX_IDS_PER_REQUEST = 20
+
     # API-Football fixture status codes mapped to internal state IDs
     # (used by convert.state_id_to_status and writers.py)
     _STATUS_TO_STATE_ID = {
@@ -43,19 +50,18 @@ class ApiFootballHandler(object):
         "Penalty": 16,
     }
 
-    def __init__(self, params, league_data, writer, config_handler):
+    def __init__(self, params, league_data, writer, config_handler, use_cache=True):
         self.params = params
         self.league_data = league_data
         self.writer = writer
         self.config_handler = config_handler
         self._season_cache = {}
+        self.session = SessionHandler(config_handler)
+        self.cache = CacheHandler(config_handler, "api-football", use_cache)
 
     def _headers(self):
         return {"x-apisports-key": self.params.get("api_token", "")}
 
-    def show_profile(self):
-        self.writer.show_profile(self.config_handler.get_data("profile"))
-
     def get_leagues(self):
         """Return leagues in a shape compatible with bettingbook.get_possible_leagues()."""
         items = self._get("leagues", {"current": "true"}) or []
@@ -76,20 +82,70 @@ class ApiFootballHandler(object):
         leagues = self.get_leagues()
         self.writer.show_leagues(leagues)
 
-    def _get(self, endpoint, extra_params=None):
-        """GET from API-Football; handles auth, error checking, and pagination."""
+    def show_connection_stats(self):
+        self.writer.show_connection_stats(*self.session.connection_stats())
+
+    def _get(self, endpoint, extra_params=None, fresh=False):
+        """GET from API-Football; handles auth, error checking, and pagination.
+        With fresh, the cached response is skipped, the new one is still cached."""
         params = {}
-        if self.params.get("tz") and endpoint == "fixtures":
+        if self.params.get("tz") and endpoint in ("fixtures", "odds"):
             params["timezone"] = self.params["tz"]
         if extra_params:
             params.update(extra_params)
 
-        req = requests.get(
+        data = None if fresh else self.cache.get(endpoint, params)
+        if data is not None:
+            return data
+
+        body = self._get_page(endpoint, params)
+        data = body.get("response", [])
+        paging = body.get("paging", {})
+        total_pages = int(paging.get("total", 1))
+
+        def get_next_page(page):
+            page_params = dict(params)
+            page_params["page"] = page
+            return self._get_page(endpoint, page_params).get("response", [])
+
+        for next_data in self.session.map(get_next_page, range(2, total_pages + 1)):
+            data.extend(next_data)
+        self.cache.set(
+            endpoint, params, data, self._cache_class(endpoint, params, data)
+        )
+        return data
+
+    @staticmethod
+    def _cache_class(endpoint, params, data):
+        """Pick the cache TTL class for a response."""
+        if endpoint in ("leagues", "standings", "odds"):
+            return endpoint
+        if endpoint != "fixtures" or "live" in params or not data:
+            return "live"
+        statuses = set()
+        for item in data:
+            status_short = ((item.get("fixture") or {}).get("status") or {}).get(
+                "short", "NS"
+            )
+            statuses.add(
+                convert.state_id_to_status(
+                    ApiFootballHandler._STATUS_TO_STATE_ID.get(status_short, 1)
+                )
+            )
+        if statuses <= convert.FINISHED_STATUSES:
+            return CacheHandler.NO_EXPIRY
+        if statuses & convert.LIVE_STATUSES:
+            return "live"
+        return "fixtures"
+
+    def _get_page(self, endpoint, params):
+        """GET a single page, retrying transient failures, and return its body."""
+        req = self.session.get_retrying(
             ApiFootballHandler.BASE_URL + endpoint,
             headers=self._headers(),
             params=params,
         )
-        if req.status_code != requests.codes.ok:
+        if req.status_code != requests.codes.ok or not req.text:
             self._show_request_error(req)
 
         body = json.loads(req.text)
@@ -99,24 +155,7 @@ class ApiFootballHandler(object):
                 raise APIErrorException(next(iter(errors.values())))
             elif isinstance(errors, list) and errors:
                 raise APIErrorException(str(errors[0]))
-
-        data = body.get("response", [])
-        paging = body.get("paging", {})
-        total_pages = int(paging.get("total", 1))
-        for page in range(2, total_pages + 1):
-            page_params = dict(params)
-            page_params["page"] = page
-            next_req = requests.get(
-                ApiFootballHandler.BASE_URL + endpoint,
-                headers=self._headers(),
-                params=page_params,
-            )
-            if next_req.status_code != requests.codes.ok or not next_req.text:
-                continue
-            next_data = json.loads(next_req.text).get("response", [])
-            if next_data:
-                data.extend(next_data)
-        return data
+        return body
 
     def reset_params(self):
         self.params = {
@@ -148,20 +187,10 @@ class ApiFootballHandler(object):
             raise APIErrorException("Whoops... Something went wrong!")
 
     def get_league_ids(self):
-        league_ids = []
-        for x in self.league_data:
-            ids = list(x.values())[0]
-            for league_id in ids:
-                league_ids.extend([league_id])
-        return league_ids
+        return self.league_data.all_ids()
 
     def get_league_abbreviation(self, league_name):
-        for x in self.league_data:
-            abbreviation = list(x.keys())[0]
-            ids = list(x.values())[0]
-            if league_name == abbreviation:
-                return ids
-        return None
+        return self.league_data.ids(league_name)
 
     # ------------------------------------------------------------------ #
     #  Normalisation: API-Football → internal shape                        #
@@ -192,48 +221,57 @@ class ApiFootballHandler(object):
         country_name = league.get("country", "")
         country_id = sum(ord(c) for c in country_name)
 
-        return {
-            "id": fix["id"],
-            "state_id": state_id,
-            "starting_at": starting_at,
-            "starting_at_timestamp": fix.get("timestamp", 0),
-            "minute": (fix.get("status") or {}).get("elapsed"),
-            "extra_minute": (fix.get("status") or {}).get("extra"),
-            "league_id": league["id"],
-            "league": {
-                "id": league["id"],
-                "name": league["name"],
-                "country_id": country_id,
-            },
-            "participants": [
-                {
-                    "id": teams["home"]["id"],
-                    "name": teams["home"]["name"],
-                    "meta": {"location": "home"},
-                },
-                {
-                    "id": teams["away"]["id"],
-                    "name": teams["away"]["name"],
-                    "meta": {"location": "away"},
-                },
-            ],
-            "scores": [
-                {
-                    "description": "CURRENT",
-                    "score": {"participant": "home", "goals": goals.get("home") or 0},
-                },
-                {
-                    "description": "CURRENT",
-                    "score": {"participant": "away", "goals": goals.get("away") or 0},
+        return Fixture(
+            {
+                "id": fix["id"],
+                "state_id": state_id,
+                "starting_at": starting_at,
+                "starting_at_timestamp": fix.get("timestamp", 0),
+                "minute": (fix.get("status") or {}).get("elapsed"),
+                "extra_minute": (fix.get("status") or {}).get("extra"),
+                "league_id": league["id"],
+                "league": {
+                    "id": league["id"],
+                    "name": league["name"],
+                    "country_id": country_id,
+                    "season": league.get("season"),
                 },
-            ],
-            # round=None → writers.groupby_round raises TypeError → falls back to stage
-            "round": {"name": round_name} if round_name is not None else None,
-            "stage": {"name": stage_name or "Regular Season"},
-            "events": events,
-            "odds": [],
-            "periods": [],
-        }
+                "participants": [
+                    {
+                        "id": teams["home"]["id"],
+                        "name": teams["home"]["name"],
+                        "meta": {"location": "home"},
+                    },
+                    {
+                        "id": teams["away"]["id"],
+                        "name": teams["away"]["name"],
+                        "meta": {"location": "away"},
+                    },
+                ],
+                "scores": [
+                    {
+                        "description": "CURRENT",
+                        "score": {
+                            "participant": "home",
+                            "goals": goals.get("home") or 0,
+                        },
+                    },
+                    {
+                        "description": "CURRENT",
+                        "score": {
+                            "participant": "away",
+                            "goals": goals.get("away") or 0,
+                        },
+                    },
+                ],
+                # round=None → writers.groupby_round raises TypeError → falls back to stage
+                "round": {"name": round_name} if round_name is not None else None,
+                "stage": {"name": stage_name or "Regular Season"},
+                "events": events,
+                "odds": [],
+                "periods": [],
+            }
+        )
 
     def _normalize_events(self, raw_events, home_team_id):
         """Map API-Football goal events to the internal events format."""
@@ -330,102 +368,215 @@ class ApiFootballHandler(object):
     #  Fixture fetching helpers                                            #
     # ------------------------------------------------------------------ #
 
+    @staticmethod
+    def _status_filter(statuses):
+        """Return the status= value selecting the given statuses, or an empty
+        dict when every status is wanted."""
+        if statuses is None:
+            return {}
+        codes = [
+            code
+            for code, state_id in ApiFootballHandler._STATUS_TO_STATE_ID.items()
+            if convert.state_id_to_status(state_id) in statuses
+        ]
+        return {"status": "-".join(codes)}
+
     def _fetch_live(self, league_ids=None):
-        """Fetch live fixtures. Always fetches all live matches, then filters by league."""
-        items = self._get("fixtures", {"live": "all"}) or []
-        fixtures = [self._normalize_fixture(item) for item in items]
-        if league_ids:
-            fixtures = [f for f in fixtures if f["league_id"] in league_ids]
-        return fixtures
+        """Fetch live fixtures, of the given leagues only when there are any."""
+        live = "-".join(str(league_id) for league_id in league_ids or []) or "all"
+        items = self._get("fixtures", {"live": live}) or []
+        return [self._normalize_fixture(item) for item in items]
 
-    def _fetch_today(self, league_ids=None):
+    def _fetch_today(self, league_ids=None, statuses=None):
         """Fetch today's fixtures including finished matches.
         With a league filter: use from/to so FT matches are included.
         Without a league filter: use date (single call, may omit FT)."""
         today = datetime.datetime.strftime(datetime.datetime.now(), "%Y-%m-%d")
         if league_ids:
-            return self._fetch_range(today, today, league_ids)
-        items = self._get("fixtures", {"date": today}) or []
+            return self._fetch_range(today, today, league_ids, statuses)
+        params = {"date": today}
+        params.update(self._status_filter(statuses))
+        items = self._get("fixtures", params) or []
         return [self._normalize_fixture(item) for item in items]
 
-    def _fetch_range(self, start, end, league_ids=None):
+    def _fetch_range(self, start, end, league_ids=None, statuses=None):
         """Fetch fixtures for a date range.
         API-Football requires league + season for range queries, so one
-        call per league ID."""
+        call per league ID. Leagues are fetched concurrently and merged
+        in league order."""
         all_ids = league_ids or self.get_league_ids()
-        fixtures = []
-        for league_id in all_ids:
+        status_filter = self._status_filter(statuses)
+
+        def fetch_league(league_id):
             season = self._get_current_season(league_id)
-            items = (
-                self._get(
-                    "fixtures",
-                    {
-                        "league": league_id,
-                        "season": season,
-                        "from": start,
-                        "to": end,
-                    },
-                )
-                or []
-            )
-            fixtures.extend(self._normalize_fixture(item) for item in items)
+            params = {
+                "league": league_id,
+                "season": season,
+                "from": start,
+                "to": end,
+            }
+            params.update(status_filter)
+            items = self._get("fixtures", params) or []
+            return [self._normalize_fixture(item) for item in items]
+
+        fixtures = []
+        for league_fixtures in self.session.map(fetch_league, all_ids):
+            fixtures.extend(league_fixtures)
         return fixtures
 
-    def _attach_odds(self, fixtures):
+    def _attach_odds(self, fixtures, fresh=False):
         """Fetch Match Winner odds for each non-finished fixture and attach inline.
-        Only called when -O / --odds is requested.
-        Returns True if odds are unavailable due to plan restrictions."""
-        label_map = {"Home": "1", "Draw": "X", "Away": "2"}
+        Fixtures sharing a date and league are fetched in bulk via the paginated
+        odds endpoint and joined on fixture ID; the rest fall back to concurrent
+        per-fixture calls. Only called when -O / --odds is requested.
+        Returns True if odds are unavailable due to plan restrictions.
+        With fresh, cached odds are not used."""
         finished = {"FT", "AET", "FT_PEN", "CANCL", "POSTP", "ABAN", "WO"}
-        for fixture in fixtures:
-            if convert.state_id_to_status(fixture.get("state_id", 1)) in finished:
-                continue
+        pending = {
+            fixture["id"]: fixture
+            for fixture in fixtures
+            if fixture.status not in finished
+        }
+        groups = {}
+        for fixture in pending.values():
+            key = (
+                fixture.get("starting_at", "")[:10],
+                fixture["league_id"],
+                fixture["league"].get("season"),
+            )
+            groups.setdefault(key, []).append(fixture)
+        # A bulk call only pays off when it replaces more than one fixture call
+        bulk_groups = [
+            key for key, group in groups.items() if len(group) > 1 and all(key)
+        ]
+
+        def fetch_group_odds(key):
+            date, league_id, season = key
             try:
-                odds_data = (
-                    self._get("odds", {"fixture": fixture["id"], "bet": 1}) or []
+                return (
+                    self._get(
+                        "odds",
+                        {"date": date, "league": league_id, "season": season, "bet": 1},
+                        fresh,
+                    )
+                    or []
+                )
+            except APIErrorException as e:
+                if "not accessible from your plan" in str(e):
+                    raise
+                return None
+
+        def fetch_fixture_odds(fixture):
+            try:
+                return (
+                    self._get("odds", {"fixture": fixture["id"], "bet": 1}, fresh) or []
                 )
-                if not odds_data:
-                    continue
-                for bookmaker in odds_data[0].get("bookmakers") or []:
-                    for bet in bookmaker.get("bets") or []:
-                        if bet.get("name") != "Match Winner":
-                            continue
-                        for val in bet.get("values") or []:
-                            label = label_map.get(val.get("value", ""))
-                            if label:
-                                fixture["odds"].append(
-                                    {"label": label, "value": val.get("odd", "0")}
-                                )
-                        break
-                    break
             except APIErrorException as e:
                 if "not accessible from your plan" in str(e):
-                    return True
-            except (KeyError, IndexError, TypeError):
-                pass
+                    raise
+                return []
+
+        try:
+            covered = set()
+            for key, odds_data in zip(
+                bulk_groups, self.session.map(fetch_group_odds, bulk_groups)
+            ):
+                if odds_data is None:
+                    continue
+                covered.update(fixture["id"] for fixture in groups[key])
+                for item in odds_data:
+                    fixture = pending.get((item.get("fixture") or {}).get("id"))
+                    if fixture is not None and not fixture["odds"]:
+                        fixture["odds"] = self._parse_odds(item)
+            missing = [
+                fixture
+                for fixture in pending.values()
+                if fixture["id"] not in covered and not fixture["odds"]
+            ]
+            for fixture, odds_data in zip(
+                missing, self.session.map(fetch_fixture_odds, missing)
+            ):
+                if odds_data:
+                    fixture["odds"] = self._parse_odds(odds_data[0])
+        except APIErrorException as e:
+            if "not accessible from your plan" in str(e):
+                return True
         return False
 
+    @staticmethod
+    def _parse_odds(odds_item):
+        """Return the first bookmaker's Match Winner odds in the internal format."""
+        label_map = {"Home": "1", "Draw": "X", "Away": "2"}
+        odds = []
+        for bookmaker in odds_item.get("bookmakers") or []:
+            for bet in bookmaker.get("bets") or []:
+                if bet.get("name") != "Match Winner":
+                    continue
+                for val in bet.get("values") or []:
+                    label = label_map.get(val.get("value", ""))
+                    if label:
+                        odds.append({"label": label, "value": val.get("odd", "0")})
+                break
+            break
+        return odds
+
+    def _get_fixtures_by_ids(self, fixture_ids, failed=None, fresh=False):
+        """Fetch raw fixtures by ID, in concurrent chunks of at most
+        MAX_IDS_PER_REQUEST IDs. Returns the fixtures in the order of the IDs
+        and the IDs that were not found or whose chunk failed. The IDs of
+        failed chunks are also added to failed, when given. With fresh, cached
+        fixtures are not used."""
+
+        def fetch_chunk(chunk):
+            try:
+                return self._get("fixtures", {"ids": "-".join(chunk)}, fresh) or []
+            except APIErrorException:
+                if failed is not None:
+                    failed.extend(chunk)
+                return []
+
+        return self.session.fetch_by_ids(
+            fetch_chunk,
+            fixture_ids,
+            ApiFootballHandler.MAX_IDS_PER_REQUEST,
+            lambda item: item["fixture"]["id"],
+        )
+
     def _attach_events(self, fixtures):
-        """Fetch goal events per started fixture for --details display.
-        API-Football does not include events in list responses."""
-        for fixture in fixtures:
-            if fixture.get("state_id", 1) in (1, 10, 12, 13):
+        """Attach goal events to every started fixture for --details display.
+        API-Football only includes events when fixtures are requested by ID,
+        so they are loaded in batches; fixtures a batch did not cover fall
+        back to the per-fixture events endpoint."""
+        started = [
+            fixture
+            for fixture in fixtures
+            if fixture.status not in ("NS", "POSTP", "CANCL", "TBA")
+        ]
+        items, _ = self._get_fixtures_by_ids(fixture["id"] for fixture in started)
+        items = {item["fixture"]["id"]: item for item in items}
+
+        missing = []
+        for fixture in started:
+            item = items.get(fixture["id"])
+            if item is None or item.get("events") is None:
+                missing.append(fixture)
                 continue
+            home_id = fixture.home_id
+            fixture["events"] = self._normalize_events(item["events"], home_id)
+
+        def fetch_fixture_events(fixture):
             try:
-                raw_events = (
-                    self._get("fixtures/events", {"fixture": fixture["id"]}) or []
-                )
-                home_id = next(
-                    (
-                        p["id"]
-                        for p in fixture.get("participants", [])
-                        if p["meta"]["location"] == "home"
-                    ),
-                    None,
-                )
-                fixture["events"] = self._normalize_events(raw_events, home_id)
-            except (APIErrorException, KeyError, TypeError):
-                pass
+                return self._get("fixtures/events", {"fixture": fixture["id"]}) or []
+            except APIErrorException:
+                return None
+
+        for fixture, raw_events in zip(
+            missing, self.session.map(fetch_fixture_events, missing)
+        ):
+            if raw_events is None:
+                continue
+            home_id = fixture.home_id
+            fixture["events"] = self._normalize_events(raw_events, home_id)
 
     # ------------------------------------------------------------------ #
     #  Public interface (unchanged from Sportmonks version)               #
@@ -453,35 +604,44 @@ class ApiFootballHandler(object):
 
     def get_matches(self, parameters):
         if parameters.league_name:
-            if parameters.refresh:
-                while True:
-                    self.get_match_data_for_leagues(parameters)
-                    time.sleep(60)
-            else:
-                self.get_match_data_for_leagues(parameters)
+            get_match_data = self.get_match_data_for_leagues
         else:
-            if parameters.refresh:
-                while True:
-                    self.try_to_get_match_data(parameters)
-                    time.sleep(60)
-            else:
-                self.try_to_get_match_data(parameters)
+            get_match_data = self.try_to_get_match_data
+        if not parameters.refresh:
+            get_match_data(parameters)
+            return
+        scheduler = PollScheduler(self.config_handler)
+        while True:
+            self.writer.start_frame(parameters.place_bet)
+            fixtures = get_match_data(parameters)
+            self.writer.end_frame()
+            delay = scheduler.next_delay(fixtures)
+            if delay is None:
+                click.secho("All matches have finished, stopped refreshing.")
+                return
+            time.sleep(delay)
 
     def get_match_data_for_leagues(self, parameters):
+        fixtures = []
         for i, league_abbr in enumerate(parameters.league_name):
             league_ids = self.get_league_abbreviation(league_abbr)
             if not league_ids:
                 continue
-            self.try_to_get_match_data(parameters, i == 0, league_ids=league_ids)
+            fixtures.extend(
+                self.try_to_get_match_data(parameters, i == 0, league_ids=league_ids)
+            )
+        return fixtures
 
     def try_to_get_match_data(self, parameters, first=False, league_ids=None):
         start, end = self.set_start_end(parameters.days)
         try:
-            self.get_match_data(parameters, start, end, first, league_ids=league_ids)
+            return self.get_match_data(
+                parameters, start, end, first, league_ids=league_ids
+            )
         except APIErrorException as e:
             if parameters.show_odds and "not accessible from your plan" in str(e):
                 try:
-                    self.get_match_data(
+                    return self.get_match_data(
                         parameters,
                         start,
                         end,
@@ -493,6 +653,7 @@ class ApiFootballHandler(object):
                     click.secho(str(e2), fg="red", bold=True)
             else:
                 click.secho(str(e), fg="red", bold=True)
+        return []
 
     def get_match_data(
         self, parameters, start, end, first=False, league_ids=None, include_odds=None
@@ -501,12 +662,20 @@ class ApiFootballHandler(object):
             include_odds = parameters.show_odds or parameters.place_bet
 
         type_sort = parameters.type_sort
+        statuses = convert.statuses_to_show(
+            type_sort, parameters.place_bet, parameters.not_started
+        )
+        # A --refresh loop needs the hidden matches as well to know when to
+        # poll again, so they are only filtered out after the download then
+        pushed = None if parameters.refresh else statuses
         if type_sort == "live":
             fixtures = self._fetch_live(league_ids)
         elif type_sort == "today":
-            fixtures = self._fetch_today(league_ids)
+            fixtures = self._fetch_today(league_ids, pushed)
         else:
-            fixtures = self._fetch_range(start, end, league_ids)
+            fixtures = self._fetch_range(start, end, league_ids, pushed)
+        fixtures, hidden, dropped = split_shown(fixtures, statuses)
+        self.session.discard(fixture.data for fixture in hidden + dropped)
 
         if include_odds and fixtures:
             if self._attach_odds(fixtures):
@@ -535,7 +704,7 @@ class ApiFootballHandler(object):
                     )
             else:
                 click.secho(parameters.msg[0], fg="red", bold=True)
-            return
+            return hidden
 
         bet_matches = self.writer.league_scores(fixtures, parameters, first)
         if parameters.place_bet:
@@ -547,18 +716,25 @@ class ApiFootballHandler(object):
                     fg="red",
                     bold=True,
                 )
+        return fixtures + hidden
 
-    def get_multi_matches(self, match_ids, predictions, parameters):
+    def get_multi_matches(self, match_ids, bets, parameters):
         if not match_ids:
             click.secho(parameters.msg[0], fg="red", bold=True)
             return True
-        ids_param = "-".join(match_ids.split(","))
-        items = self._get("fixtures", {"ids": ids_param}) or []
+        items, missing = self._get_fixtures_by_ids(match_ids)
+        if missing:
+            click.secho(
+                f"Could not get the matches with ID {', '.join(missing)}.",
+                fg="red",
+                bold=True,
+            )
         fixtures = [self._normalize_fixture(item) for item in items]
         if not fixtures:
             click.secho(parameters.msg[0], fg="red", bold=True)
-            return
-        self.writer.league_scores(fixtures, parameters, True, predictions)
+            return []
+        self.writer.league_scores(fixtures, parameters, True, bets)
+        return fixtures
 
     def get_standings(self, leagues, show_details):
         for league in leagues:
@@ -593,7 +769,7 @@ class ApiFootballHandler(object):
                     matches.extend([str(bet_matches[int(match_id) - 1])])
                 except (IndexError, ValueError):
                     pass
-            match_data = self.get_match_bet(",".join(matches))
+            match_data = self.get_match_bet(matches)
             match_data = self.check_match_data(match_data)
             if match_data == "no_matches":
                 click.secho("There are no valid matches selected.", fg="red", bold=True)
@@ -601,13 +777,20 @@ class ApiFootballHandler(object):
                 self.place_bet_betting(match_data)
 
     def get_match_bet(self, matches):
-        """Fetch fixtures by ID and attach odds (used by the betting workflow)."""
-        ids_param = "-".join(matches.split(","))
-        items = self._get("fixtures", {"ids": ids_param}) or []
+        """Fetch fixtures by ID and attach odds (used by the betting workflow).
+        The cache is bypassed, bets are placed on the current status and odds."""
+        items, _ = self._get_fixtures_by_ids(matches, fresh=True)
         fixtures = [self._normalize_fixture(item) for item in items]
-        self._attach_odds(fixtures)
+        self._attach_odds(fixtures, fresh=True)
         return fixtures
 
+    def get_match_results(self, match_ids):
+        """Fetch fixtures by ID without odds, for settling open bets. Returns
+        the fixtures and the IDs whose request failed."""
+        failed = []
+        items, _ = self._get_fixtures_by_ids(match_ids, failed)
+        return [self._normalize_fixture(item) for item in items], failed
+
     @staticmethod
     def check_match_bet(match_bet, max_match_id):
         matches = set()
@@ -635,9 +818,7 @@ class ApiFootballHandler(object):
     def check_match_data(match_data):
         matches = []
         for match in match_data:
-            home = convert.get_home_team(match).get("name", "")
-            away = convert.get_away_team(match).get("name", "")
-            status = convert.state_id_to_status(match.get("state_id"))
+            home, away, status = match.home_name, match.away_name, match.status
             if not match.get("odds"):
                 click.secho(
                     f"The match {home} - {away} doesn't have any odds available (yet).",
@@ -2,9 +2,14 @@ import click
 import os
 import csv
 import datetime
+import json
+import threading
+import time
 
 import convert
+import ledger
 from exceptions import APIErrorException
+from file_handler import atomic_write
 
 from configparser import ConfigParser
 
@@ -12,12 +17,19 @@ config = ConfigParser()
 
 
 class Betting(object):
+    # Seconds after kickoff before a match can have finished (90 minutes and half-time)
+    MATCH_DURATION = 105 * 60
+
     def __init__(self, params, league_data, writer, request_handler, config_handler):
         self.params = params
         self.league_data = league_data
         self.writer = writer
         self.request_handler = request_handler
         self.config_handler = config_handler
+        self.ledger = ledger.Ledger(config_handler.get("betting_files", "ledger"))
+        self.settlement_thread = None
+        self.results = []
+        self._results_lock = threading.Lock()
 
     @staticmethod
     def check_for_files(files):
@@ -27,103 +39,119 @@ class Betting(object):
             if not os.path.exists(filename):
                 open(filename, "w+")
 
+    def get_bets(self, type_sort):
+        if type_sort == "open":
+            return self.ledger.open_bets()
+        return self.ledger.closed_bets()
+
     @staticmethod
-    def get_bets(filename):
-        with open(filename, "r") as f:
-            reader = list(csv.reader(f))
-        return reader
-
-    def write_to_bets_file(self, data, bet_type):
-        with open(
-            self.config_handler.get("betting_files", bet_type), "a", newline=""
-        ) as f:
-            writer = csv.writer(f)
-            writer.writerow(data)
-        self.remove_empty_lines_csv_file(
-            self.config_handler.get("betting_files", bet_type)
-        )
+    def due_at(bet):
+        """Return when the match of an open bet can have finished. Bets whose
+        kickoff is not known are always due."""
+        if bet["kickoff"] is None:
+            return 0
+        return bet["kickoff"] + Betting.MATCH_DURATION
 
-    def update_open_bets_file(self, data):
-        with open(
-            self.config_handler.get("betting_files", "open_bets"), "w", newline=""
-        ) as f:
-            writer = csv.writer(f)
-            for line in data:
-                writer.writerow(line)
-        self.remove_empty_lines_csv_file(
-            self.config_handler.get("betting_files", "open_bets")
+    def _settlement_filename(self):
+        return os.path.join(
+            os.path.dirname(self.config_handler.get("betting_files", "open_bets")),
+            "settlement.json",
         )
 
-    @staticmethod
-    def remove_empty_lines_csv_file(file):
+    def get_last_checked(self):
         try:
-            file_object = open(file, "r")
-            lines = csv.reader(file_object, delimiter=",", quotechar='"')
-            flag = 0
-            data = []
-            for line in lines:
-                if not line:
-                    flag = 1
-                    continue
-                else:
-                    data.append(line)
-            file_object.close()
-            if flag == 1:  # if blank line is present in file
-                file_object = open(file, "w")
-                for line in data:
-                    str1 = ",".join(line)
-                    file_object.write(str1 + "\n")
-                file_object.close()
-        except Exception as e:
-            click.secho(e)
-
-    def check_open_bets(self):
+            with open(self._settlement_filename(), "r") as f:
+                return float(json.load(f)["last_checked"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return 0
+
+    def set_last_checked(self, timestamp):
         try:
-            reader = self.get_bets(
-                self.config_handler.get("betting_files", "open_bets")
+            with atomic_write(self._settlement_filename()) as f:
+                json.dump({"last_checked": timestamp}, f)
+        except OSError:
+            pass
+
+    def check_open_bets(self, throttle=False):
+        """Settle every open bet whose match has finished, with one chunked
+        fetch of the open matches and a single ledger transaction.
+        Only bets whose match can have finished are fetched. With throttle,
+        nothing is fetched when every due bet was already due at a check less
+        than check_interval seconds ago. The check only counts as done when
+        the matches of every due bet could be fetched."""
+        now = time.time()
+        due = self.ledger.due_bets(now - Betting.MATCH_DURATION)
+        if not due:
+            return
+        if throttle:
+            last_checked = self.get_last_checked()
+            check_interval = int(
+                self.config_handler.get_optional("settlement", "check_interval")
             )
-        except Exception:
+            if now - last_checked < check_interval and all(
+                self.due_at(bet) <= last_checked for bet in due
+            ):
+                return
+        match_ids = list(dict.fromkeys(bet["match_id"] for bet in due))
+        try:
+            results, failed = self.request_handler.get_match_results(match_ids)
+        except APIErrorException:
             return
-        for i, row in enumerate(reader):
-            try:
-                match_bets = self.request_handler.get_match_bet(row[0])
-            except APIErrorException:
+        if not failed:
+            self.set_last_checked(now)
+        matches = {str(match.id): match for match in results}
+
+        settlements = []
+        for bet in due:
+            match_data = matches.get(bet["match_id"])
+            if match_data is None or match_data.status not in ["FT", "AET", "FT_PEN"]:
                 continue
-            if not match_bets:
+            settlements.append(self.calculate_winning_odd(match_data, bet))
+        if settlements:
+            self.settle_bets(settlements, {bet["id"]: bet for bet in due})
+
+    def settle_bets(self, settlements, bets):
+        """Close the settled bets and pay out their winnings. The results are
+        held until show_results() or pop_results(), as settling can run next to
+        a live dashboard."""
+        closed = set(self.ledger.settle(settlements))
+        results = []
+        for bet_id, _, correct, payout in settlements:
+            if bet_id not in closed:
                 continue
-            match_data = match_bets[0]
-            if convert.state_id_to_status(match_data.get("state_id")) in [
-                "FT",
-                "AET",
-                "FT_PEN",
-            ]:
-                self.calculate_winning_odd(match_data, i, row, reader)
-
-    def calculate_winning_odd(self, match_data, i, row, reader):
-        home_score = convert.get_current_score(match_data, "home")
-        away_score = convert.get_current_score(match_data, "away")
-        status = convert.state_id_to_status(match_data.get("state_id"))
+            match = f"{bets[bet_id]['home_team']} - {bets[bet_id]['away_team']}"
+            if correct:
+                results.append(
+                    f"Woohoo! You predicted {match} correct and won "
+                    f"{convert.cents_to_currency(payout)}"
+                )
+            else:
+                results.append(f"Ah, no! You predicted {match} incorrect")
+        if results:
+            results.append(
+                f"Updated balance: {convert.cents_to_currency(self.get_balance())}\n"
+            )
+            with self._results_lock:
+                self.results.extend(results)
+
+    def pop_results(self):
+        """Return the results of the bets settled since the last call."""
+        with self._results_lock:
+            results, self.results = self.results, []
+        return results
+
+    def show_results(self):
+        for result in self.pop_results():
+            click.echo(result)
+
+    def calculate_winning_odd(self, match_data, bet):
+        """Return the settlement of a bet on a finished match."""
         winning_team = self.writer.calculate_winning_team(
-            home_score, away_score, status
+            match_data.home_goals, match_data.away_goals, match_data.status
         )
-        home_name = convert.get_home_team(match_data).get("name", "")
-        away_name = convert.get_away_team(match_data).get("name", "")
-        predicted_team = row[1]
-        potential_wins = row[3]
-        if winning_team == predicted_team:
-            click.echo(
-                f"Woohoo! You predicted {home_name} - {away_name} correct and won {potential_wins}"
-            )
-            self.update_balance(
-                convert.float_to_currency(potential_wins), operation="win"
-            )
-            row.extend((winning_team, "yes"))
-        else:
-            click.echo(f"Ah, no! You predicted {home_name} - {away_name} incorrect")
-            row.extend((winning_team, "no"))
-        self.write_to_bets_file(row, "closed_bets")
-        del reader[i][0:]
-        self.update_open_bets_file(reader)
+        if winning_team == bet["prediction"]:
+            return bet["id"], winning_team, True, bet["potential_wins"]
+        return bet["id"], winning_team, False, 0
 
     def get_odds(self, match):
         def average_odd(odd_in):
@@ -184,11 +212,11 @@ class Betting(object):
         return prediction
 
     def get_stake(self):
-        balance = convert.float_to_currency(
-            self.config_handler.get("profile", "balance")
-        )
-        stake = convert.float_to_currency(
-            click.prompt(f"What is your stake? (max. " f"{balance})", type=float)
+        """Ask for the stake and return it in cents."""
+        balance = self.get_balance()
+        max_stake = convert.cents_to_currency(balance)
+        stake = convert.to_cents(
+            click.prompt(f"What is your stake? (max. {max_stake})", type=float)
         )
         while stake > balance or stake <= 0:
             click.secho(
@@ -196,8 +224,8 @@ class Betting(object):
                 fg="red",
                 bold=True,
             )
-            stake = convert.float_to_currency(
-                click.prompt(f"What is your stake? (max. " f"{balance})", type=float)
+            stake = convert.to_cents(
+                click.prompt(f"What is your stake? (max. {max_stake})", type=float)
             )
         return stake
 
@@ -205,8 +233,9 @@ class Betting(object):
     def get_confirmation(prediction, stake, potential_wins):
         msg = convert.prediction_to_msg(prediction)
         return click.confirm(
-            f"Are you sure that the match will result in a {msg} with a stake of {stake}? "
-            f"This can result in a potential win of {potential_wins}"
+            f"Are you sure that the match will result in a {msg} with a stake of "
+            f"{convert.cents_to_currency(stake)}? This can result in a potential win "
+            f"of {convert.cents_to_currency(potential_wins)}"
         )
 
     @staticmethod
@@ -217,21 +246,47 @@ class Betting(object):
             odd = odds[1]
         else:
             odd = odds[2]
-        odd = convert.float_to_currency(odd)
-        potential_wins = convert.float_to_currency(stake * odd)
+        odd = convert.cents_to_currency(convert.to_cents(odd))
+        potential_wins = convert.multiply_cents(stake, odd)
         return potential_wins, odd
 
-    def update_balance(self, stake, operation):
-        balance = convert.float_to_currency(
-            self.config_handler.get("profile", "balance")
+    def get_balance(self):
+        """Return the balance in cents."""
+        return self.ledger.balance()
+
+    def get_profile(self):
+        profile = self.config_handler.get_data("profile")
+        profile["balance"] = convert.cents_to_currency(self.get_balance())
+        staked, won = self.ledger.totals()
+        profile["total_staked"] = convert.cents_to_currency(staked)
+        profile["total_won"] = convert.cents_to_currency(won)
+        return profile
+
+    def get_balance_history(self):
+        """Return (date, balance) pairs for the balance graph: the rows of the
+        balance history file written by older versions, then the ledger."""
+        history = []
+        date_format = convert.format_date(
+            self.config_handler.get("profile", "date_format")
         )
-        if operation == "loss":
-            balance = balance - stake
-        elif operation == "win":
-            balance = balance + stake
-        self.config_handler.update_config_file("profile", "balance", str(balance))
-        click.secho(f"Updated balance: {balance}\n")
-        self.update_graph_data(balance)
+        try:
+            with open(
+                self.config_handler.get("betting_files", "balance_history"), "r"
+            ) as f:
+                for row in csv.reader(f):
+                    if row:
+                        date = datetime.datetime.strptime(row[0], date_format)
+                        history.append((date, float(row[1])))
+        except (OSError, ValueError, IndexError):
+            pass
+        for timestamp, balance in self.ledger.balance_history():
+            history.append(
+                (
+                    datetime.datetime.fromtimestamp(timestamp),
+                    balance / 100,
+                )
+            )
+        return history
 
     def place_bet(self, matches):
         click.secho("\nMatches on which you want to bet:\n")
@@ -247,98 +302,99 @@ class Betting(object):
         date = datetime.datetime.strftime(
             datetime.datetime.now(), date_format + " %H:%M:%S"
         )
-        home_name = convert.get_home_team(match).get("name", "")
-        away_name = convert.get_away_team(match).get("name", "")
         click.echo(
-            f"Betting on {home_name} - {away_name} in "
+            f"Betting on {match.home_name} - {match.away_name} in "
             f"{league_name} with odds:\n1: {odds[0]}, X: {odds[1]}, 2: {odds[2]}"
         )
         prediction, stake = self.get_input()
-        stake = convert.float_to_currency(stake)
         potential_wins, odd = self.calculate_potential_wins(prediction, stake, odds)
         data = [prediction, stake, potential_wins, odd, match, date]
         self.place_bet_confirmation(data)
 
     def place_bet_confirmation(self, data_in):
         if self.get_confirmation(data_in[0], data_in[1], data_in[2]):
-            self.update_balance(data_in[1], "loss")
-            match = data_in[4]
-            data_out = [
-                match["id"],
-                data_in[0],
-                data_in[1],
-                data_in[2],
-                data_in[3],
-                convert.get_home_team(match).get("name", ""),
-                convert.get_away_team(match).get("name", ""),
-                convert.datetime(
-                    match.get("starting_at", ""),
-                    convert.format_date(
-                        self.config_handler.get("profile", "date_format")
-                    ),
-                ),
-                data_in[5],
-            ]
-            self.write_to_bets_file(data_out, "open_bets")
+            self.save_bet(*data_in)
         else:
             click.secho("Your bet is canceled\n")
 
-    def view_bets(self, type_sort):
-        self.main()
-        sort_reverse = True
-        if type_sort == "open":
-            sort_reverse = False
-        bets = sorted(
-            self.get_bets(
-                self.config_handler.get_data("betting_files")[f"{type_sort}_bets"]
+    def save_bet(self, prediction, stake, potential_wins, odd, match, date):
+        """Store a bet and take its stake, in cents, from the balance. The
+        ledger checks the balance again, as another process may have placed a
+        bet since the stake was entered."""
+        bet_id = self.ledger.add_bet(
+            match["id"],
+            prediction,
+            stake,
+            potential_wins,
+            odd,
+            match.home_name,
+            match.away_name,
+            convert.datetime(
+                match.get("starting_at", ""),
+                convert.format_date(self.config_handler.get("profile", "date_format")),
             ),
-            key=lambda x: (x[7]),
-            reverse=sort_reverse,
+            date,
+            match.kickoff,
+        )
+        if bet_id is None:
+            click.secho(
+                "Your balance changed and is now lower than your stake. "
+                "Your bet is canceled\n",
+                fg="red",
+                bold=True,
+            )
+            return False
+        click.secho(
+            f"Updated balance: {convert.cents_to_currency(self.get_balance())}\n"
         )
+        return True
+
+    def view_bets(self, type_sort):
+        self.wait_for_settlement()
+        bets = self.ledger.bet_lines(type_sort)
         if len(bets) == 0:
             click.secho(f"\nNo {type_sort} bets found.", fg="red", bold=True)
+            return
+        click.secho(f"\n{type_sort.title()} bets:", bold=True)
+        if type_sort == "open":
+            click.secho(
+                f"{'MATCH':50} {'PREDICTION':15} {'ODD':10} {'STAKE':10} {'POTENTIAL WINS':20} "
+                f"{'DATE AND TIME':20}",
+                bold=True,
+            )
         else:
-            click.secho(f"\n{type_sort.title()} bets:", bold=True)
-            if type_sort == "open":
-                click.secho(
-                    f"{'MATCH':50} {'PREDICTION':15} {'ODD':10} {'STAKE':10} {'POTENTIAL WINS':20} "
-                    f"{'DATE AND TIME':20}",
-                    bold=True,
-                )
-            else:
-                click.secho(
-                    f"{'MATCH':50} {'PREDICTION':15} {'ODD':10} {'STAKE':10} {'POTENTIAL WINS':20} "
-                    f"{'DATE AND TIME':20} {'RESULT':10} {'CORRECT':10}",
-                    bold=True,
-                )
-            for bet in bets:
-                if type_sort == "open":
-                    bet_str = (
-                        f"{bet[5] + ' - ' + bet[6]:<50} {bet[1]:<15} {bet[4]:<10} "
-                        f"{bet[2]:<10} {bet[3]:<20} {bet[7]:<20}"
-                    )
-                else:
-                    bet_str = (
-                        f"{bet[5] + ' - ' + bet[6]:<50} {bet[1]:<15} {bet[4]:<10} "
-                        f"{bet[2]:<10} {bet[3]:<20} {bet[7]:<20} {bet[9]:<10} {bet[10]:<10}"
-                    )
-                click.secho(bet_str)
-
-    def update_graph_data(self, balance):
-        date_format = convert.format_date(
-            self.config_handler.get("profile", "date_format")
-        )
-        now = datetime.date.strftime(datetime.date.today(), date_format)
-
-        with open(
-            self.config_handler.get("betting_files", "balance_history"), "a", newline=""
-        ) as f:
-            writer = csv.writer(f)
-            writer.writerow([now, balance])
-        self.remove_empty_lines_csv_file(
-            self.config_handler.get("betting_files", "balance_history")
-        )
+            click.secho(
+                f"{'MATCH':50} {'PREDICTION':15} {'ODD':10} {'STAKE':10} {'POTENTIAL WINS':20} "
+                f"{'DATE AND TIME':20} {'RESULT':10} {'CORRECT':10}",
+                bold=True,
+            )
+        click.echo("\n".join(bets))
+
+    def wait_for_settlement(self):
+        """Block until a settlement started by main() in the background is done
+        and show its results."""
+        if self.settlement_thread is not None:
+            self.settlement_thread.join()
+            self.settlement_thread = None
+        self.show_results()
 
     def main(self):
         self.check_for_files(self.config_handler.get_data("betting_files").values())
-        self.check_open_bets()
+        date_format = convert.format_date(
+            self.config_handler.get("profile", "date_format")
+        )
+        if not self.ledger.is_migrated():
+            self.ledger.migrate_csv(
+                self.config_handler.get("betting_files", "open_bets"),
+                self.config_handler.get("betting_files", "closed_bets"),
+                self.config_handler.get("profile", "balance"),
+                date_format,
+            )
+        if self.config_handler.get_optional_boolean("settlement", "background"):
+            self.settlement_thread = threading.Thread(
+                target=self.check_open_bets, kwargs={"throttle": True}
+            )
+            self.settlement_thread.start()
+        else:
+            self.check_open_bets(throttle=True)
+            self.show_results()
@@ -1,19 +1,21 @@
 #!/usr/bin/env python3
 
 import click
+import json
+import os
+import threading
 from collections import namedtuple
 
-import graph_plotter
 from config_handler import ConfigHandler
-from request_handler import RequestHandler
-from exceptions import IncorrectParametersException
+from request_handler import LazyRequestHandler, RequestHandler
+from exceptions import APIErrorException, IncorrectParametersException
+from file_handler import atomic_write
 from writers import get_writer
 from betting import Betting
+from poll_scheduler import PollScheduler
 import convert
 import time
 
-LEAGUES_DATA = []
-
 
 def get_params(api_token, timezone):
     params = {}
@@ -32,7 +34,7 @@ def bettable_balance(balance):
     return False if float(balance) <= 0.00 else True
 
 
-def check_options(days, bet, live, today, refresh, matches):
+def check_options(days, bet, live, today, refresh, matches, balance):
     if days < 0 and (live or today):
         raise IncorrectParametersException(
             "Negative --days is not supported for --live/--today. "
@@ -48,7 +50,7 @@ def check_options(days, bet, live, today, refresh, matches):
             "--refresh is not supported for --matches. "
             "Use --live or --today to use this parameters"
         )
-    if bet and not bettable_balance(ch.get("profile", "balance")):
+    if bet and not bettable_balance(balance):
         raise IncorrectParametersException(
             "--betting can't be used because you have a too low balance"
         )
@@ -79,25 +81,76 @@ def _generate_league_abbreviation(league, existing_abbrs):
     return str(league["id"])
 
 
-def get_possible_leagues():
+def _league_catalog_filename():
+    return os.path.join(
+        os.path.dirname(ch.get("betting_files", "open_bets")), "league_catalog.json"
+    )
+
+
+def _read_league_catalog():
+    try:
+        with open(_league_catalog_filename(), "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _fetch_league_catalog():
+    """Fetch the leagues from the API and persist them as the local league catalog."""
     params = get_params(ch.get("auth", "api_token"), ch.get("profile", "timezone"))
-    rh = RequestHandler(params, LEAGUES_DATA, None, ch)
-    leagues = rh.get_leagues()
-    if not leagues:
+    rh = RequestHandler(params, convert.LEAGUES, None, ch, use_cache=False)
+    try:
+        leagues = rh.get_leagues()
+    except APIErrorException:
         return []
-    existing_abbrs = {list(entry.keys())[0] for entry in LEAGUES_DATA}
-    result = []
-    for league in leagues:
-        abbr = convert.league_id_to_league_abbreviation(league["id"])
-        if not abbr:
+    if leagues:
+        filename = _league_catalog_filename()
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        with atomic_write(filename) as f:
+            json.dump({"updated_at": time.time(), "leagues": leagues}, f)
+    return leagues
+
+
+def get_possible_leagues():
+    """Load the league catalog into convert.LEAGUES and return the abbreviations.
+    The catalog is read from disk and only fetched when it doesn't exist yet,
+    a stale catalog is refreshed in the background for the next run."""
+    if not convert.LEAGUES:
+        catalog = _read_league_catalog()
+        if catalog is None:
+            leagues = _fetch_league_catalog()
+        else:
+            leagues = catalog["leagues"]
+            catalog_age = time.time() - catalog["updated_at"]
+            if catalog_age > int(ch.get_optional("cache", "catalog_ttl")):
+                threading.Thread(target=_fetch_league_catalog).start()
+        existing_abbrs = set()
+        for league in leagues:
+            if convert.LEAGUES.abbreviation(league["id"]):
+                continue
             abbr = _generate_league_abbreviation(league, existing_abbrs)
-            new_entry = {abbr: [league["id"]], "name": league["name"]}
-            LEAGUES_DATA.append(new_entry)
-            convert.LEAGUES_DATA.append(new_entry)
+            convert.LEAGUES.add(abbr, [league["id"]], league["name"])
             existing_abbrs.add(abbr)
-        if abbr:
-            result.append(abbr)
-    return sorted(set(result))
+    return convert.LEAGUES.abbreviations()
+
+
+def validate_leagues(ctx, param, value):
+    possible_leagues = get_possible_leagues() if value else []
+    for league in value:
+        if league not in possible_leagues:
+            raise click.BadParameter(
+                f"{league!r} is not a known league. "
+                "Use --possible-leagues to see the available leagues."
+            )
+    return value
+
+
+def complete_leagues(ctx, param, incomplete):
+    catalog = _read_league_catalog() or {"leagues": []}
+    existing_abbrs = set()
+    for league in catalog["leagues"]:
+        existing_abbrs.add(_generate_league_abbreviation(league, existing_abbrs))
+    return sorted(abbr for abbr in existing_abbrs if abbr.startswith(incomplete))
 
 
 @click.command()
@@ -126,8 +179,9 @@ def get_possible_leagues():
 @click.option(
     "--league",
     "-l",
-    type=click.Choice(get_possible_leagues()),
     multiple=True,
+    callback=validate_leagues,
+    shell_complete=complete_leagues,
     help="Show fixtures from a particular league.",
 )
 @click.option(
@@ -193,6 +247,12 @@ def get_possible_leagues():
     help="Show all leagues available in your API plan.",
 )
 @click.option("--balance-history", "-BH", is_flag=True)
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    default=False,
+    help="Ignore cached API responses and fetch everything again.",
+)
 def main(
     api_token,
     timezone,
@@ -215,15 +275,40 @@ def main(
     watch_bets,
     possible_leagues,
     balance_history,
+    no_cache,
 ):
 
     params = get_params(api_token, timezone)
+    writer = get_writer()
+    rh = LazyRequestHandler(params, convert.LEAGUES, writer, ch, use_cache=not no_cache)
+    betting = None
 
     try:
-        writer = get_writer()
-        rh = RequestHandler(params, LEAGUES_DATA, writer, ch)
-        betting = Betting(params, LEAGUES_DATA, writer, rh, ch)
+        betting = Betting(params, convert.LEAGUES, writer, rh, ch)
         betting.main()
+        # Commands that read or change bets or the balance need settlement done
+        if (
+            bet
+            or profile
+            or all_bets
+            or open_bets
+            or closed_bets
+            or watch_bets
+            or balance_history
+        ):
+            betting.wait_for_settlement()
+
+        # Only the commands that show league names need the league catalog
+        if (
+            live
+            or today
+            or matches
+            or standings
+            or watch_bets
+            or possible_leagues
+            or ((open_bets or closed_bets) and details)
+        ):
+            get_possible_leagues()
 
         Parameters = namedtuple(
             "parameters",
@@ -231,11 +316,11 @@ def main(
             "show_details, show_odds, not_started, refresh, place_bet, date_format, type_sort",
         )
 
-        def get_multi_matches(filename, parameters):
-            bets = betting.get_bets(ch.get_data("betting_files")[filename])
-            match_ids = ",".join([i[0] for i in bets])
-            predictions = [i[0] + ";" + i[1] for i in bets]
-            return rh.get_multi_matches(match_ids, predictions, parameters)
+        def get_multi_matches(type_sort, parameters):
+            bets = {}
+            for bet in betting.get_bets(type_sort):
+                bets.setdefault(int(bet["match_id"]), []).append(bet)
+            return rh.get_multi_matches(list(bets), bets, parameters)
 
         def bet_matches(type, sort_by):
             date_format = convert.format_date(ch.get("profile", "date_format"))
@@ -259,24 +344,29 @@ def main(
                 "watch_bets",
             )
             if type == "open" and watch_bets:
-                filename = "open_bets"
+                scheduler = PollScheduler(ch)
                 while True:
                     betting.check_open_bets()
-                    quit = get_multi_matches(filename, parameters)
-                    if quit:
+                    writer.start_frame(False)
+                    fixtures = get_multi_matches(type, parameters)
+                    writer.settlement_results(betting.pop_results())
+                    writer.end_frame()
+                    if fixtures is True:
                         return
-                    else:
-                        time.sleep(60)
-            elif type == "open":
-                filename = "open_bets"
-            else:
-                filename = "closed_bets"
+                    delay = scheduler.next_delay(fixtures)
+                    if delay is None:
+                        betting.check_open_bets()
+                        betting.show_results()
+                        return
+                    time.sleep(delay)
 
-            get_multi_matches(filename, parameters)
+            get_multi_matches(type, parameters)
             return
 
         if live or today or matches:
-            check_options(days, bet, live, today, refresh, matches)
+            check_options(
+                days, bet, live, today, refresh, matches, betting.get_balance()
+            )
             date_format = convert.format_date(ch.get("profile", "date_format"))
             if sort_by is None:
                 sort_by = "league"
@@ -344,7 +434,7 @@ def main(
             return
 
         if profile:
-            rh.show_profile()
+            writer.show_profile(betting.get_profile())
             return
 
         if all_bets:
@@ -374,11 +464,23 @@ def main(
             return
 
         if balance_history:
-            graph_plotter.show_full_graph()
+            # matplotlib is slow to import, so only load it for this command
+            import graph_plotter
+
+            graph_plotter.show_full_graph(
+                betting.get_balance_history(),
+                convert.format_date(ch.get("profile", "date_format")),
+            )
             return
 
     except IncorrectParametersException as e:
         click.secho(str(e), fg="red", bold=True)
+    finally:
+        # Show the results of a settlement that ran next to the command
+        if betting is not None:
+            betting.wait_for_settlement()
+        if rh.is_loaded() and ch.get_optional_boolean("http", "show_stats"):
+            rh.show_connection_stats()
 
 
 if __name__ == "__main__":
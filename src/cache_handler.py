@@ -0,0 +1,110 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+
+class CacheHandler(object):
+    """On-disk cache of API responses with a TTL per endpoint class and LRU eviction.
+
+    Entries live next to the betting files, one JSON file per backend,
+    endpoint and set of params. Reading an entry touches its file, so the
+    file modification times double as the LRU order."""
+
+    # TTL classes that never expire, e.g. fixture lists where every match is final
+    NO_EXPIRY = "finished"
+
+    def __init__(self, config_handler, backend, enabled=True):
+        self.backend = backend
+        self.enabled = enabled and config_handler.get_optional_boolean(
+            "cache", "enabled"
+        )
+        self.max_entries = int(config_handler.get_optional("cache", "max_entries"))
+        self.directory = os.path.join(
+            os.path.dirname(config_handler.get("betting_files", "open_bets")), "cache"
+        )
+        self.ttls = {
+            ttl_class: int(config_handler.get_optional("cache", f"{ttl_class}_ttl"))
+            for ttl_class in ["leagues", "standings", "fixtures", "live", "odds"]
+        }
+
+    def _path(self, endpoint, params):
+        params = sorted(
+            (key, str(value))
+            for key, value in (params or {}).items()
+            if key != "api_token"
+        )
+        key = json.dumps([self.backend, endpoint, params])
+        return os.path.join(
+            self.directory, hashlib.sha1(key.encode()).hexdigest() + ".json"
+        )
+
+    def get(self, endpoint, params):
+        """Return the cached data, or None when missing or expired."""
+        if not self.enabled:
+            return None
+        path = self._path(endpoint, params)
+        try:
+            with open(path, "r") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry["expires_at"] is not None and entry["expires_at"] < time.time():
+            self._remove(path)
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry["data"]
+
+    def set(self, endpoint, params, data, ttl_class):
+        if not self.enabled or data is None:
+            return
+        if ttl_class == CacheHandler.NO_EXPIRY:
+            expires_at = None
+        else:
+            ttl = self.ttls[ttl_class]
+            if ttl <= 0:
+                return
+            expires_at = time.time() + ttl
+        path = self._path(endpoint, params)
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump({"expires_at": expires_at, "data": data}, f)
+            os.replace(tmp_path, path)
+        except OSError:
+            self._remove(tmp_path)
+            return
+        self._evict()
+
+    def _evict(self):
+        """Remove the least recently used entries above max_entries."""
+        try:
+            paths = [
+                os.path.join(self.directory, name)
+                for name in os.listdir(self.directory)
+                if name.endswith(".json")
+            ]
+        except OSError:
+            return
+        if len(paths) <= self.max_entries:
+            return
+        used = []
+        for path in paths:
+            try:
+                used.append((os.path.getmtime(path), path))
+            except OSError:
+                pass
+        for _, path in sorted(used)[: len(used) - self.max_entries]:
+            self._remove(path)
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
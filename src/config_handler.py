@@ -1,29 +1,97 @@
 import os
+import threading
 
 from configparser import ConfigParser
+from contextlib import contextmanager, nullcontext
+
+from file_handler import FileLock, atomic_write
 
 config = ConfigParser()
 
 
 class ConfigHandler(object):
     FILENAME = os.path.join(os.getcwd(), "config.ini")
+    LOCK_FILENAME = os.path.join(os.getcwd(), "config.lock")
+
+    # Settings that may be left out of config.ini, with their default values
+    OPTIONAL_DEFAULTS = {
+        "http": {
+            "pool_connections": "4",
+            "pool_maxsize": "10",
+            "connect_timeout": "5",
+            "read_timeout": "30",
+            "max_workers": "4",
+            "retries": "2",
+            "retry_backoff": "0.5",
+            "show_stats": "no",
+        },
+        "cache": {
+            "enabled": "yes",
+            "max_entries": "500",
+            "leagues_ttl": "259200",
+            "standings_ttl": "600",
+            "fixtures_ttl": "300",
+            "live_ttl": "15",
+            "odds_ttl": "600",
+            "catalog_ttl": "86400",
+        },
+        "polling": {
+            "live_interval": "30",
+            "break_interval": "120",
+            "idle_interval": "300",
+            "min_interval": "15",
+            "max_interval": "3600",
+        },
+        "settlement": {
+            "check_interval": "300",
+            "background": "no",
+        },
+    }
 
     def __init__(self):
-        pass
+        self._loaded_stat = None
+        self._pending_writes = 0
+        self._batch_depth = 0
+        self._lock = threading.RLock()
 
     def load_config_file(self):
-        if not os.path.exists(ConfigHandler.FILENAME):
-            api_token = str(input("Give the API-token: "))
-            name = str(input("Give your name: "))
-            timezone = str(input("Give your timezone (e.a. Europe/Amsterdam): "))
-            self.create_config_file(api_token, name, timezone)
-        config.read(ConfigHandler.FILENAME)
-        self.check_config_file()
+        """Parse and validate config.ini, again only when the file has changed."""
+        with self._lock:
+            if not os.path.exists(ConfigHandler.FILENAME):
+                api_token = str(input("Give the API-token: "))
+                name = str(input("Give your name: "))
+                timezone = str(input("Give your timezone (e.a. Europe/Amsterdam): "))
+                self.create_config_file(api_token, name, timezone)
+            if self._file_stat() == self._loaded_stat:
+                return
+            for section in config.sections():
+                config.remove_section(section)
+            config.read(ConfigHandler.FILENAME)
+            self._loaded_stat = self._file_stat()
+            self.check_config_file()
+
+    @staticmethod
+    def _file_stat():
+        stat = os.stat(ConfigHandler.FILENAME)
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
 
     def get(self, section, value):
         self.load_config_file()
         return config.get(section, value)
 
+    def get_optional(self, section, value):
+        self.load_config_file()
+        return config.get(
+            section,
+            value,
+            fallback=ConfigHandler.OPTIONAL_DEFAULTS[section][value],
+        )
+
+    def get_optional_boolean(self, section, value):
+        return config.BOOLEAN_STATES.get(
+            self.get_optional(section, value).lower(), False
+        )
+
     def get_data(self, section):
         self.load_config_file()
         data = {}
@@ -31,30 +99,63 @@ class ConfigHandler(object):
             data[key] = val
         return data
 
-    @staticmethod
-    def update_config_file(section, key, value):
-        config.set(section, key, value)
-        with open(ConfigHandler.FILENAME, "w") as cfgfile:
-            config.write(cfgfile)
+    def update_config_file(self, section, key, value):
+        """Set a value and write config.ini, or once at the end of a batch()."""
+        with self.batch():
+            config.set(section, key, value)
+            self._pending_writes += 1
 
-    @staticmethod
-    def create_config_file(api_token, name, timezone):
-        config.add_section("auth")
-        config.set("auth", "api_token", api_token)
-        config.set("auth", "backend", "api-football")
-        config.add_section("profile")
-        config.set("profile", "name", name)
-        config.set("profile", "balance", "100.00")
-        config.set("profile", "timezone", timezone)
-        config.set("profile", "date_format", "d-m-Y")
-        config.add_section("betting_files")
-        config.set("betting_files", "open_bets", "betting_files/open_bets.csv")
-        config.set("betting_files", "closed_bets", "betting_files/closed_bets.csv")
-        config.set(
-            "betting_files", "balance_history", "betting_files/balance_history.csv"
-        )
-        with open(ConfigHandler.FILENAME, "w") as cfgfile:
+    @contextmanager
+    def batch(self):
+        """Collect every update_config_file() in the block into a single write.
+
+        The block holds a lock on config.lock that other processes respect,
+        and config.ini is read again when it is entered, so a value read and
+        updated in the block can't overwrite a change made by another
+        process in the meantime."""
+        with self._lock:
+            outermost = not self._batch_depth
+            with FileLock(ConfigHandler.LOCK_FILENAME) if outermost else nullcontext():
+                self._batch_depth += 1
+                try:
+                    if outermost and os.path.exists(ConfigHandler.FILENAME):
+                        self.load_config_file()
+                    yield
+                finally:
+                    self._batch_depth -= 1
+                    if outermost and self._pending_writes:
+                        self._write_config_file()
+
+    def _write_config_file(self):
+        """Write config.ini atomically through a temporary file and a rename."""
+        with atomic_write(ConfigHandler.FILENAME) as cfgfile:
             config.write(cfgfile)
+        self._pending_writes = 0
+        self._loaded_stat = self._file_stat()
+
+    def create_config_file(self, api_token, name, timezone):
+        with self.batch():
+            config.add_section("auth")
+            self.update_config_file("auth", "api_token", api_token)
+            self.update_config_file("auth", "backend", "api-football")
+            config.add_section("profile")
+            self.update_config_file("profile", "name", name)
+            self.update_config_file("profile", "balance", "100.00")
+            self.update_config_file("profile", "timezone", timezone)
+            self.update_config_file("profile", "date_format", "d-m-Y")
+            config.add_section("betting_files")
+            self.update_config_file(
+                "betting_files", "open_bets", "betting_files/open_bets.csv"
+            )
+            self.update_config_file(
+                "betting_files", "closed_bets", "betting_files/closed_bets.csv"
+            )
+            self.update_config_file(
+                "betting_files", "balance_history", "betting_files/balance_history.csv"
+            )
+            self.update_config_file(
+                "betting_files", "ledger", "betting_files/ledger.db"
+            )
 
     @staticmethod
     def get_missing_data_config():
@@ -81,12 +182,17 @@ class ConfigHandler(object):
                 "open_bets",
                 "closed_bets",
                 "balance_history",
+                "ledger",
             ]
             if x not in keys
         ]
         return missing_sections, missing_keys, missing_options
 
     def check_config_file(self):
+        with self.batch():
+            self._fill_missing_config()
+
+    def _fill_missing_config(self):
         missing_sections, missing_keys, missing_options = self.get_missing_data_config()
         for missing_key in missing_keys:
             if missing_key not in [
@@ -96,6 +202,7 @@ class ConfigHandler(object):
                 "balance_history",
                 "open_bets",
                 "closed_bets",
+                "ledger",
             ]:
                 value = str(input(f"Give the value for {missing_key}: "))
             elif missing_key == "backend":
@@ -110,6 +217,8 @@ class ConfigHandler(object):
                 value = "betting_files/open_bets.csv"
             elif missing_key == "closed_bets":
                 value = "betting_files/closed_bets.csv"
+            elif missing_key == "ledger":
+                value = "betting_files/ledger.db"
             if missing_key in ["name", "balance", "timezone", "date_format"]:
                 if "profile" in missing_sections:
                     config.add_section("profile")
@@ -118,7 +227,12 @@ class ConfigHandler(object):
                 if "auth" in missing_sections:
                     config.add_section("auth")
                 self.update_config_file("auth", missing_key, value)
-            elif missing_key in ["open_bets", "closed_bets", "balance_history"]:
+            elif missing_key in [
+                "open_bets",
+                "closed_bets",
+                "balance_history",
+                "ledger",
+            ]:
                 if "betting_files" in missing_sections:
                     config.add_section("betting_files")
                 self.update_config_file("betting_files", missing_key, value)
@@ -132,6 +246,7 @@ class ConfigHandler(object):
                 "balance_history",
                 "open_bets",
                 "closed_bets",
+                "ledger",
             ]:
                 value = str(input(f"Give the value for {missing_option[0]}: "))
             elif missing_option[0] == "balance":
@@ -144,9 +259,16 @@ class ConfigHandler(object):
                 value = "betting_files/open_bets.csv"
             elif missing_option[0] == "closed_bets":
                 value = "betting_files/closed_bets.csv"
+            elif missing_option[0] == "ledger":
+                value = "betting_files/ledger.db"
             if missing_option[0] in ["name", "balance", "timezone", "date_format"]:
                 self.update_config_file("profile", missing_option[0], value)
             elif missing_option[0] == "api_token":
                 self.update_config_file("auth", missing_option[0], value)
-            elif missing_option[0] in ["open_bets", "closed_bets", "balance_history"]:
+            elif missing_option[0] in [
+                "open_bets",
+                "closed_bets",
+                "balance_history",
+                "ledger",
+            ]:
                 self.update_config_file("betting_files", missing_option[0], value)
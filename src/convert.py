@@ -1,10 +1,10 @@
 from datetime import datetime
-from re import sub
-from decimal import Decimal
+from decimal import ROUND_HALF_UP, Decimal
 
 import writers
+from league_registry import LeagueRegistry
 
-LEAGUES_DATA = []
+LEAGUES = LeagueRegistry()
 
 dt = datetime
 
@@ -35,25 +35,20 @@ STATE_ID_MAP = {
     32: "ABAN",
 }
 
+# Statuses after which a match will not change anymore
+FINISHED_STATUSES = {"FT", "AET", "FT_PEN", "CANCL", "WO", "AWARDED"}
+
+LIVE_STATUSES = {"LIVE", "HT", "ET", "PEN_LIVE", "BREAK", "AU", "INT"}
+
 GOAL_TYPE_IDS = {14: "goal", 15: "own-goal", 16: "penalty"}
 
 
 def league_id_to_league_name(league_id):
-    for leagues in LEAGUES_DATA:
-        league_name = list(leagues.values())[1]
-        league_ids = list(leagues.values())[0]
-        if int(league_id) in league_ids:
-            return league_name
-    return ""
+    return LEAGUES.name(league_id)
 
 
 def league_id_to_league_abbreviation(league_id):
-    for leagues in LEAGUES_DATA:
-        league_abbr = list(leagues.keys())[0]
-        league_ids = list(leagues.values())[0]
-        if int(league_id) in league_ids:
-            return league_abbr
-    return ""
+    return LEAGUES.abbreviation(league_id)
 
 
 def format_date(date_format):
@@ -116,6 +111,18 @@ def state_id_to_status(state_id):
     return STATE_ID_MAP.get(state_id, "NS")
 
 
+def statuses_to_show(type_sort, place_bet, not_started):
+    """Return the statuses of the matches a view shows, or None when it shows
+    matches of every status."""
+    all_statuses = set(STATE_ID_MAP.values())
+    statuses = all_statuses - set(
+        writers.Stdout.get_match_statuses_to_skip(type_sort, place_bet)
+    )
+    if not_started:
+        statuses &= {"NS"}
+    return None if statuses == all_statuses else statuses
+
+
 def get_home_team(match):
     for p in match.get("participants", []):
         if p.get("meta", {}).get("location") == "home":
@@ -168,7 +175,20 @@ def events_to_pretty_goals(events, home_goals, away_goals):
         return writers.Stdout.get_pretty_goals(events)
 
 
-def float_to_currency(float_value):
-    currency_value = "{:,.2f}".format(float(float_value))
-    currency_value = Decimal(sub(r"[^\d.]", "", currency_value))
-    return currency_value
+def to_cents(value):
+    """Parse an amount like 12.5, "12.50" or "1,012.50" to integer cents.
+    Floats are read through their shortest repr, so 0.1 is exactly 10 cents."""
+    amount = Decimal(str(value).replace(",", "")).scaleb(2)
+    return int(amount.to_integral_value(rounding=ROUND_HALF_UP))
+
+
+def cents_to_currency(cents):
+    """Format integer cents as an amount like 12.50."""
+    sign = "-" if cents < 0 else ""
+    return f"{sign}{abs(cents) // 100}.{abs(cents) % 100:02d}"
+
+
+def multiply_cents(cents, odd):
+    """Multiply an amount in cents by an odd like "2.47", rounded half up to
+    whole cents."""
+    return (cents * to_cents(odd) + 50) // 100
@@ -0,0 +1,65 @@
+import convert
+
+
+def split_shown(fixtures, statuses):
+    """Split fixtures into the ones a view shows, the ones it hides because of
+    their status and the ones of leagues outside the catalog. Used for the
+    filters the API could not apply."""
+    shown, hidden, dropped = [], [], []
+    for fixture in fixtures:
+        if not convert.league_id_to_league_name(fixture.league_id):
+            dropped.append(fixture)
+        elif statuses is None or fixture.status in statuses:
+            shown.append(fixture)
+        else:
+            hidden.append(fixture)
+    return shown, hidden, dropped
+
+
+class Fixture(object):
+    """A match as the views and the settlement use it.
+
+    The fields every view needs are worked out once, when the API data comes
+    in. The rest of the API data, like odds, events and rounds, is still read
+    with fixture["key"] and fixture.get("key")."""
+
+    __slots__ = (
+        "data",
+        "id",
+        "league_id",
+        "status",
+        "kickoff",
+        "home_id",
+        "home_name",
+        "away_id",
+        "away_name",
+        "home_goals",
+        "away_goals",
+    )
+
+    def __init__(self, data):
+        self.data = data
+        self.id = data["id"]
+        self.league_id = data.get("league_id")
+        self.status = convert.state_id_to_status(data.get("state_id"))
+        self.kickoff = data.get("starting_at_timestamp") or 0
+        home = convert.get_home_team(data)
+        away = convert.get_away_team(data)
+        self.home_id = home.get("id")
+        self.home_name = home.get("name", "")
+        self.away_id = away.get("id")
+        self.away_name = away.get("name", "")
+        self.home_goals = convert.get_current_score(data, "home")
+        self.away_goals = convert.get_current_score(data, "away")
+
+    def __getitem__(self, key):
+        return self.data[key]
+
+    def __setitem__(self, key, value):
+        self.data[key] = value
+
+    def __contains__(self, key):
+        return key in self.data
+
+    def get(self, key, default=None):
+        return self.data.get(key, default)
@@ -1,14 +1,9 @@
 import copy
-import csv
-import datetime as dt
 
 import matplotlib.dates as mdates
 import matplotlib.path
 import matplotlib.pyplot as plt
 
-import convert
-from config_handler import ConfigHandler
-
 
 # matplotlib 3.10.x has a broken Path.__deepcopy__ that calls
 # copy.deepcopy(super(), memo), which recurses infinitely on Python 3.14.
@@ -25,19 +20,10 @@ def _path_deepcopy(self, memo):
 matplotlib.path.Path.__deepcopy__ = _path_deepcopy
 
 
-def show_full_graph():
-    dates = []
-    balances = []
-    ch = ConfigHandler()
-
-    with open(ch.get("betting_files", "balance_history"), "r") as csv_file:
-        plots = csv.reader(csv_file, delimiter=",")
-        for row in plots:
-            dates.append(row[0])
-            balances.append(float(row[1]))
-
-    date_format = convert.format_date(ch.get("profile", "date_format"))
-    dates = [dt.datetime.strptime(d, date_format) for d in dates]
+def show_full_graph(history, date_format):
+    """Plot (date, balance) pairs, as returned by Betting.get_balance_history."""
+    dates = [date for date, _ in history]
+    balances = [balance for _, balance in history]
 
     _, ax = plt.subplots()
 
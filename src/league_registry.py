@@ -0,0 +1,34 @@
+class LeagueRegistry(object):
+    """The league catalog, indexed by league ID and by abbreviation.
+
+    Built once from the league catalog and extended whenever a league gets
+    a generated abbreviation, so every lookup is a dict access."""
+
+    def __init__(self):
+        self._names = {}
+        self._abbreviations = {}
+        self._ids = {}
+
+    def __len__(self):
+        return len(self._ids)
+
+    def add(self, abbreviation, league_ids, name):
+        self._ids.setdefault(abbreviation, []).extend(league_ids)
+        for league_id in league_ids:
+            self._names.setdefault(league_id, name)
+            self._abbreviations.setdefault(league_id, abbreviation)
+
+    def name(self, league_id):
+        return self._names.get(int(league_id), "")
+
+    def abbreviation(self, league_id):
+        return self._abbreviations.get(int(league_id), "")
+
+    def ids(self, abbreviation):
+        return self._ids.get(abbreviation)
+
+    def all_ids(self):
+        return [league_id for ids in self._ids.values() for league_id in ids]
+
+    def abbreviations(self):
+        return sorted(self._ids)
@@ -0,0 +1,362 @@
+import csv
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import convert
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS bets (
+    id INTEGER PRIMARY KEY,
+    match_id TEXT NOT NULL,
+    prediction TEXT NOT NULL,
+    stake INTEGER NOT NULL,
+    potential_wins INTEGER NOT NULL,
+    odd TEXT NOT NULL,
+    home_team TEXT NOT NULL,
+    away_team TEXT NOT NULL,
+    match_date TEXT NOT NULL,
+    placed_at TEXT NOT NULL,
+    kickoff INTEGER,
+    status TEXT NOT NULL DEFAULT 'open'
+);
+CREATE INDEX IF NOT EXISTS bets_match_id ON bets (match_id);
+CREATE INDEX IF NOT EXISTS bets_status_kickoff ON bets (status, kickoff);
+CREATE TABLE IF NOT EXISTS settlements (
+    bet_id INTEGER PRIMARY KEY REFERENCES bets (id),
+    result TEXT NOT NULL,
+    correct INTEGER NOT NULL,
+    payout INTEGER NOT NULL,
+    settled_at INTEGER
+);
+CREATE TABLE IF NOT EXISTS balance_events (
+    id INTEGER PRIMARY KEY,
+    amount INTEGER NOT NULL,
+    reason TEXT NOT NULL,
+    bet_id INTEGER REFERENCES bets (id),
+    created_at INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS balance_events_created_at ON balance_events (created_at);
+CREATE TABLE IF NOT EXISTS balance_snapshots (
+    event_id INTEGER PRIMARY KEY REFERENCES balance_events (id),
+    balance INTEGER NOT NULL,
+    created_at INTEGER NOT NULL
+);
+"""
+
+SCHEMA_VERSION = 1
+
+# Number of balance events after which the running balance is stored again
+SNAPSHOT_INTERVAL = 100
+
+BET_COLUMNS = (
+    "bets.id, match_id, prediction, stake, potential_wins, odd, home_team, "
+    "away_team, match_date, placed_at, kickoff, status"
+)
+
+INSERT_BET = (
+    "INSERT INTO bets (match_id, prediction, stake, potential_wins, odd, "
+    "home_team, away_team, match_date, placed_at, kickoff, status) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+# SQL expression formatting a column of cents as an amount like 12.50
+MONEY = "printf('%d.%02d', {0} / 100, {0} % 100)"
+
+
+class Ledger(object):
+    """SQLite ledger of bets, their settlements and every change of the balance.
+
+    Amounts are stored as integer cents. The database runs in WAL mode, so a
+    --watch-bets loop can settle bets while another command reads them. Every
+    thread gets its own connection."""
+
+    def __init__(self, filename):
+        self.filename = filename
+        self._local = threading.local()
+
+    @property
+    def connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(
+                self.filename, timeout=30, isolation_level=None
+            )
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute("PRAGMA foreign_keys=ON")
+            connection.executescript(SCHEMA)
+            self._local.connection = connection
+        return connection
+
+    @contextmanager
+    def transaction(self):
+        """Run the block as a single write transaction."""
+        connection = self.connection
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield connection
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    def is_migrated(self):
+        return self.connection.execute("PRAGMA user_version").fetchone()[0] >= 1
+
+    def migrate_csv(self, open_bets_file, closed_bets_file, balance, date_format):
+        """Import the open and closed bets CSV files in one transaction and
+        record the current balance as the opening balance. Runs only once, the
+        CSV files are left in place as a backup."""
+        with self.transaction() as connection:
+            if self.is_migrated():
+                return
+            for filename, status in [
+                (open_bets_file, "open"),
+                (closed_bets_file, "closed"),
+            ]:
+                for row in self._read_csv(filename):
+                    self._import_row(connection, row, status, date_format)
+            self._add_event(connection, convert.to_cents(balance), "opening", None)
+            connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    @staticmethod
+    def _read_csv(filename):
+        if not os.path.exists(filename):
+            return []
+        with open(filename, "r", newline="") as f:
+            return [row for row in csv.reader(f) if row]
+
+    @staticmethod
+    def _parse_kickoff(match_date, placed_at, date_format):
+        """Return the timestamp of a match date as the CSV files stored it, in
+        date_format with the time. The year is left out when the match was in
+        the year the bet was placed, so it is then taken from placed_at.
+        Returns None when the date can't be parsed."""
+        try:
+            return int(
+                datetime.strptime(match_date, date_format + " %H:%M").timestamp()
+            )
+        except ValueError:
+            pass
+        without_year = date_format.replace("%Y", "").replace("%y", "").rstrip("-")
+        try:
+            year = datetime.strptime(placed_at, date_format + " %H:%M:%S").year
+            kickoff = datetime.strptime(
+                f"{match_date} {year}", without_year + " %H:%M %Y"
+            )
+        except ValueError:
+            return None
+        return int(kickoff.timestamp())
+
+    @staticmethod
+    def _import_row(connection, row, status, date_format):
+        kickoff = Ledger._parse_kickoff(row[7], row[8], date_format)
+        cursor = connection.execute(
+            INSERT_BET,
+            (
+                row[0],
+                row[1],
+                convert.to_cents(row[2]),
+                convert.to_cents(row[3]),
+                row[4],
+                row[5],
+                row[6],
+                row[7],
+                row[8],
+                kickoff,
+                status,
+            ),
+        )
+        if status == "closed":
+            correct = row[10] == "yes"
+            connection.execute(
+                "INSERT INTO settlements (bet_id, result, correct, payout) "
+                "VALUES (?, ?, ?, ?)",
+                (
+                    cursor.lastrowid,
+                    row[9],
+                    correct,
+                    convert.to_cents(row[3]) if correct else 0,
+                ),
+            )
+
+    def add_bet(
+        self,
+        match_id,
+        prediction,
+        stake,
+        potential_wins,
+        odd,
+        home_team,
+        away_team,
+        match_date,
+        placed_at,
+        kickoff,
+    ):
+        """Store a new open bet and take its stake from the balance, both in
+        cents. Returns the id of the bet, or None when the balance is lower
+        than the stake."""
+        with self.transaction() as connection:
+            if stake > self._balance(connection):
+                return None
+            cursor = connection.execute(
+                INSERT_BET,
+                (
+                    str(match_id),
+                    prediction,
+                    stake,
+                    potential_wins,
+                    str(odd),
+                    home_team,
+                    away_team,
+                    match_date,
+                    placed_at,
+                    kickoff or None,
+                    "open",
+                ),
+            )
+            self._add_event(connection, -stake, "stake", cursor.lastrowid)
+        return cursor.lastrowid
+
+    def open_bets(self):
+        return self.connection.execute(
+            f"SELECT {BET_COLUMNS} FROM bets WHERE status = 'open' "
+            "ORDER BY kickoff, id"
+        ).fetchall()
+
+    def closed_bets(self):
+        return self.connection.execute(
+            f"SELECT {BET_COLUMNS}, result, correct, payout, settled_at FROM bets "
+            "JOIN settlements ON settlements.bet_id = bets.id "
+            "WHERE status = 'closed' ORDER BY kickoff DESC, bets.id DESC"
+        ).fetchall()
+
+    def bet_lines(self, status):
+        """Return the open or closed bets as rows of the view_bets table. The
+        rows are formatted by SQLite, which is a lot faster than building them
+        in Python when there are many bets."""
+        columns = (
+            "'%-!50s %-!15s %-!10s %-!10s %-!20s %-!20s', "
+            "home_team || ' - ' || away_team, prediction, odd, "
+            f"{MONEY.format('stake')}, {MONEY.format('potential_wins')}, match_date"
+        )
+        if status == "open":
+            query = (
+                f"SELECT printf({columns}) FROM bets WHERE status = 'open' "
+                "ORDER BY kickoff, id"
+            )
+        else:
+            query = (
+                f"SELECT printf({columns}) || printf(' %-!10s %-!10s', result, "
+                "CASE WHEN correct THEN 'yes' ELSE 'no' END) FROM bets "
+                "JOIN settlements ON settlements.bet_id = bets.id "
+                "WHERE status = 'closed' ORDER BY kickoff DESC, bets.id DESC"
+            )
+        cursor = self.connection.cursor()
+        cursor.row_factory = None
+        return [row[0] for row in cursor.execute(query)]
+
+    def due_bets(self, kicked_off_before):
+        """Return the open bets that kicked off before the given timestamp, and
+        the bets without a known kickoff."""
+        return self.connection.execute(
+            f"SELECT {BET_COLUMNS} FROM bets WHERE status = 'open' "
+            "AND (kickoff IS NULL OR kickoff <= ?) ORDER BY kickoff, id",
+            (kicked_off_before,),
+        ).fetchall()
+
+    def settle(self, settlements):
+        """Close bets and pay out their winnings in one transaction.
+
+        settlements is a list of (bet_id, result, correct, payout) tuples,
+        with the payout in cents.
+        Bets that were already closed, e.g. by another process, are skipped.
+        Returns the ids of the bets closed here."""
+        now = int(time.time())
+        closed = []
+        with self.transaction() as connection:
+            for bet_id, result, correct, payout in settlements:
+                cursor = connection.execute(
+                    "UPDATE bets SET status = 'closed' "
+                    "WHERE id = ? AND status = 'open'",
+                    (bet_id,),
+                )
+                if not cursor.rowcount:
+                    continue
+                connection.execute(
+                    "INSERT INTO settlements "
+                    "(bet_id, result, correct, payout, settled_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (bet_id, result, correct, payout, now),
+                )
+                if payout:
+                    self._add_event(connection, payout, "win", bet_id, now)
+                closed.append(bet_id)
+        return closed
+
+    @staticmethod
+    def _add_event(connection, amount, reason, bet_id, created_at=None):
+        """Record a change of the balance, and a snapshot of the balance every
+        SNAPSHOT_INTERVAL events."""
+        if created_at is None:
+            created_at = int(time.time())
+        event_id = connection.execute(
+            "INSERT INTO balance_events (amount, reason, bet_id, created_at) "
+            "VALUES (?, ?, ?, ?)",
+            (amount, reason, bet_id, created_at),
+        ).lastrowid
+        snapshot_id, balance = Ledger._last_snapshot(connection)
+        if event_id - snapshot_id >= SNAPSHOT_INTERVAL:
+            connection.execute(
+                "INSERT INTO balance_snapshots (event_id, balance, created_at) "
+                "VALUES (?, ?, ?)",
+                (event_id, Ledger._balance(connection), created_at),
+            )
+
+    @staticmethod
+    def _last_snapshot(connection, before=None):
+        """Return the event id and balance of the last snapshot, optionally of
+        the last one taken before a timestamp."""
+        query = "SELECT event_id, balance FROM balance_snapshots"
+        params = ()
+        if before is not None:
+            query += " WHERE created_at <= ?"
+            params = (before,)
+        row = connection.execute(
+            query + " ORDER BY event_id DESC LIMIT 1", params
+        ).fetchone()
+        return (row[0], row[1]) if row else (0, 0)
+
+    @staticmethod
+    def _balance(connection, at=None):
+        """Replay the events after the last snapshot on top of it."""
+        snapshot_id, balance = Ledger._last_snapshot(connection, at)
+        query = "SELECT COALESCE(SUM(amount), 0) FROM balance_events WHERE id > ?"
+        params = (snapshot_id,)
+        if at is not None:
+            query += " AND created_at <= ?"
+            params += (at,)
+        return balance + connection.execute(query, params).fetchone()[0]
+
+    def balance(self, at=None):
+        """Return the balance in cents, now or at a timestamp."""
+        return self._balance(self.connection, at)
+
+    def totals(self):
+        """Return the total staked and the total won over all closed bets, in cents."""
+        return self.connection.execute(
+            "SELECT COALESCE(SUM(stake), 0), COALESCE(SUM(payout), 0) FROM bets "
+            "JOIN settlements ON settlements.bet_id = bets.id"
+        ).fetchone()
+
+    def balance_history(self):
+        """Return (timestamp, balance in cents) after every balance event."""
+        return self.connection.execute(
+            "SELECT created_at, SUM(amount) OVER (ORDER BY id) "
+            "FROM balance_events ORDER BY id"
+        ).fetchall()
@@ -0,0 +1,58 @@
+import time
+
+import convert
+
+
+class PollScheduler(object):
+    """Picks the delay until the next poll of a --refresh or --watch-bets loop
+    from the state and kickoff time of the fixtures that were just shown."""
+
+    # Statuses after which a match won't change anymore today
+    FINAL_STATUSES = convert.FINISHED_STATUSES | {"POSTP", "ABAN"}
+
+    IN_PLAY_STATUSES = {"LIVE", "ET", "PEN_LIVE"}
+
+    PAUSED_STATUSES = {"HT", "BREAK", "INT", "SUSP", "DELAYED", "AU"}
+
+    def __init__(self, config_handler):
+        self.live_interval = int(
+            config_handler.get_optional("polling", "live_interval")
+        )
+        self.break_interval = int(
+            config_handler.get_optional("polling", "break_interval")
+        )
+        self.idle_interval = int(
+            config_handler.get_optional("polling", "idle_interval")
+        )
+        self.min_interval = int(config_handler.get_optional("polling", "min_interval"))
+        self.max_interval = int(config_handler.get_optional("polling", "max_interval"))
+
+    def next_delay(self, fixtures, now=None):
+        """Return the seconds to sleep before the next poll, or None when
+        every fixture is final and the loop can stop."""
+        if now is None:
+            now = time.time()
+        if not fixtures:
+            return self._bound(self.idle_interval)
+        statuses = [f.status for f in fixtures]
+        if all(status in PollScheduler.FINAL_STATUSES for status in statuses):
+            return None
+        if any(status in PollScheduler.IN_PLAY_STATUSES for status in statuses):
+            return self._bound(self.live_interval)
+        if any(status in PollScheduler.PAUSED_STATUSES for status in statuses):
+            return self._bound(self.break_interval)
+        kickoffs = [
+            f.kickoff
+            for f, status in zip(fixtures, statuses)
+            if status in ("NS", "TBA")
+        ]
+        if not any(kickoffs):
+            return self._bound(self.idle_interval)
+        next_kickoff = min(kickoff for kickoff in kickoffs if kickoff)
+        if next_kickoff <= now:
+            # kickoff has passed but the match isn't live yet
+            return self._bound(self.live_interval)
+        return self._bound(next_kickoff - now)
+
+    def _bound(self, delay):
+        return max(self.min_interval, min(self.max_interval, int(delay)))
@@ -1,14 +1,39 @@
-from api_football_handler import ApiFootballHandler
-from sportmonks_handler import SportmonksHandler
+import threading
 
 
-def RequestHandler(params, league_data, writer, config_handler):
-    """Return the appropriate backend handler based on config [auth] backend."""
+def RequestHandler(params, league_data, writer, config_handler, use_cache=True):
+    """Return the appropriate backend handler based on config [auth] backend.
+    Only the module of the selected backend is imported."""
     try:
         backend = config_handler.get("auth", "backend")
     except Exception:
         backend = "api-football"
 
     if backend == "sportmonks":
-        return SportmonksHandler(params, league_data, writer, config_handler)
-    return ApiFootballHandler(params, league_data, writer, config_handler)
+        from sportmonks_handler import SportmonksHandler
+
+        return SportmonksHandler(params, league_data, writer, config_handler, use_cache)
+
+    from api_football_handler import ApiFootballHandler
+
+    return ApiFootballHandler(params, league_data, writer, config_handler, use_cache)
+
+
+class LazyRequestHandler(object):
+    """Stand-in for RequestHandler() that creates the backend handler, and
+    imports its module and HTTP stack, on first use."""
+
+    def __init__(self, *args, **kwargs):
+        self._args = args
+        self._kwargs = kwargs
+        self._handler = None
+        self._lock = threading.Lock()
+
+    def is_loaded(self):
+        return self._handler is not None
+
+    def __getattr__(self, name):
+        with self._lock:
+            if self._handler is None:
+                self._handler = RequestHandler(*self._args, **self._kwargs)
+        return getattr(self._handler, name)
@@ -0,0 +1,152 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from exceptions import APIErrorException
+
+
+class SessionHandler(object):
+    """Pooled keep-alive HTTP session shared by every request of a backend handler."""
+
+    # Responses worth another try: rate limiting and transient server errors
+    RETRY_STATUS_CODES = {
+        requests.codes.too_many_requests,
+        requests.codes.server_error,
+        requests.codes.bad_gateway,
+        requests.codes.service_unavailable,
+        requests.codes.gateway_timeout,
+    }
+
+    def __init__(self, config_handler):
+        self.timeout = (
+            float(config_handler.get_optional("http", "connect_timeout")),
+            float(config_handler.get_optional("http", "read_timeout")),
+        )
+        self.max_workers = int(config_handler.get_optional("http", "max_workers"))
+        self.retries = int(config_handler.get_optional("http", "retries"))
+        self.retry_backoff = float(config_handler.get_optional("http", "retry_backoff"))
+        self.show_stats = config_handler.get_optional_boolean("http", "show_stats")
+        self.adapter = HTTPAdapter(
+            pool_connections=int(
+                config_handler.get_optional("http", "pool_connections")
+            ),
+            pool_maxsize=int(config_handler.get_optional("http", "pool_maxsize")),
+        )
+        self.adapter.poolmanager.pool_classes_by_scheme = {
+            "http": self._counting_pool(HTTPConnectionPool),
+            "https": self._counting_pool(HTTPSConnectionPool),
+        }
+        self.session = requests.Session()
+        self.session.mount("https://", self.adapter)
+        self.session.mount("http://", self.adapter)
+        self.requests = 0
+        self.opened = 0
+        self.downloaded = 0
+        self.discarded = 0
+        self._lock = threading.Lock()
+        # map() calls can nest, so the requests in flight are bounded here
+        self._in_flight = threading.BoundedSemaphore(max(self.max_workers, 1))
+
+    def _counting_pool(self, pool_cls):
+        """Return a pool class whose connections report every new socket they open."""
+        handler = self
+
+        class CountingConnection(pool_cls.ConnectionCls):
+            def connect(self):
+                with handler._lock:
+                    handler.opened += 1
+                super().connect()
+
+        return type(
+            pool_cls.__name__, (pool_cls,), {"ConnectionCls": CountingConnection}
+        )
+
+    def get(self, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        with self._lock:
+            self.requests += 1
+        try:
+            with self._in_flight:
+                req = self.session.get(url, **kwargs)
+        except requests.exceptions.Timeout:
+            raise APIErrorException("The request timed out. Try again later.")
+        except requests.exceptions.ConnectionError:
+            raise APIErrorException("Could not connect to the API. Check your network.")
+        with self._lock:
+            self.downloaded += len(req.content)
+        return req
+
+    def get_retrying(self, url, **kwargs):
+        """GET that retries timeouts, empty bodies and transient error codes."""
+        for attempt in range(self.retries + 1):
+            last_attempt = attempt == self.retries
+            try:
+                req = self.get(url, **kwargs)
+            except APIErrorException:
+                if last_attempt:
+                    raise
+            else:
+                if req.status_code == requests.codes.ok and req.text:
+                    return req
+                if last_attempt or (
+                    req.status_code != requests.codes.ok
+                    and req.status_code not in SessionHandler.RETRY_STATUS_CODES
+                ):
+                    return req
+            time.sleep(self.retry_backoff * 2**attempt)
+
+    def map(self, func, items):
+        """Run func for every item on a worker pool, results in input order.
+        Nested calls each get their own pool, but get() keeps the requests in
+        flight at max_workers."""
+        items = list(items)
+        if len(items) <= 1 or self.max_workers <= 1:
+            return [func(item) for item in items]
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(items))) as pool:
+            return list(pool.map(func, items))
+
+    def fetch_by_ids(self, fetch, ids, chunk_size, key):
+        """Fetch items by ID in concurrent chunks of at most chunk_size IDs.
+
+        fetch gets a list of IDs and returns the items found for them, key
+        returns the ID of an item. Returns the items in the order of ids and
+        the IDs no item came back for, e.g. because their chunk failed."""
+        ids = list(dict.fromkeys(str(item_id) for item_id in ids))
+        chunks = [ids[i : i + chunk_size] for i in range(0, len(ids), chunk_size)]
+        found = {}
+        for items in self.map(fetch, chunks):
+            for item in items:
+                try:
+                    found[str(key(item))] = item
+                except (KeyError, TypeError):
+                    pass
+        return (
+            [found[item_id] for item_id in ids if item_id in found],
+            [item_id for item_id in ids if item_id not in found],
+        )
+
+    def discard(self, items):
+        """Count the size of downloaded items that were thrown away because the
+        API could not filter them out itself. The size is that of the items as
+        JSON, so it is close to, but not exactly, the bytes they took up in the
+        response. Only counted when the stats are shown."""
+        if not self.show_stats:
+            return
+        size = sum(len(json.dumps(item, default=str)) for item in items)
+        with self._lock:
+            self.discarded += size
+
+    def connection_stats(self):
+        """Return the opened and reused connection counts and the bytes
+        downloaded and discarded in this run."""
+        return (
+            self.opened,
+            max(self.requests - self.opened, 0),
+            self.downloaded,
+            self.discarded,
+        )
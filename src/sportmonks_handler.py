@@ -7,19 +7,24 @@ import time
 import convert
 from exceptions import APIErrorException
 from betting import Betting
+from session_handler import SessionHandler
+from poll_scheduler import PollScheduler
+from cache_handler import CacheHandler
+from fixture import Fixture, split_shown
 
 
 class SportmonksHandler(object):
     BASE_URL = "https://api.sportmonks.com/v3/football/"
+    # Maximum number of fixture IDs accepted by fixtures/multi
+    MAX_IDS_PER_REQUEST = 50
 
-    def __init__(self, params, league_data, writer, config_handler):
+    def __init__(self, params, league_data, writer, config_handler, use_cache=True):
         self.params = params
         self.league_data = league_data
         self.writer = writer
         self.config_handler = config_handler
-
-    def show_profile(self):
-        self.writer.show_profile(self.config_handler.get_data("profile"))
+        self.session = SessionHandler(config_handler)
+        self.cache = CacheHandler(config_handler, "sportmonks", use_cache)
 
     def get_leagues(self):
         self.params["include"] = "country"
@@ -33,8 +38,42 @@ class SportmonksHandler(object):
         leagues = self.get_leagues()
         self.writer.show_leagues(leagues)
 
-    def _get(self, url):
-        req = requests.get(SportmonksHandler.BASE_URL + url, params=self.params)
+    def show_connection_stats(self):
+        self.writer.show_connection_stats(*self.session.connection_stats())
+
+    def _get(self, url, params=None, fresh=False):
+        """GET from Sportmonks through the cache. With fresh, the cached
+        response is skipped, the new one is still cached."""
+        if params is None:
+            params = self.params
+        data = None if fresh else self.cache.get(url, params)
+        if data is not None:
+            return data
+        data = self._get_uncached(url, params)
+        self.cache.set(url, params, data, self._cache_class(url, data))
+        return data
+
+    def _get_fixtures(self, url, params=None, fresh=False):
+        return [Fixture(item) for item in self._get(url, params, fresh) or []]
+
+    @staticmethod
+    def _cache_class(url, data):
+        """Pick the cache TTL class for a response."""
+        if url.startswith("leagues"):
+            return "leagues"
+        if url.startswith("standings"):
+            return "standings"
+        if url.startswith("livescores") or not isinstance(data, list) or not data:
+            return "live"
+        statuses = {convert.state_id_to_status(item.get("state_id")) for item in data}
+        if statuses <= convert.FINISHED_STATUSES:
+            return CacheHandler.NO_EXPIRY
+        if statuses & convert.LIVE_STATUSES:
+            return "live"
+        return "fixtures"
+
+    def _get_uncached(self, url, params):
+        req = self.session.get_retrying(SportmonksHandler.BASE_URL + url, params=params)
 
         if req.status_code != requests.codes.ok:
             self._show_request_error(req)
@@ -42,7 +81,7 @@ class SportmonksHandler(object):
         msg, code = self._get_error(req)
 
         if code == requests.codes.ok:
-            return self._get_data(req, url)
+            return self._get_data(req, url, params)
         else:
             click.secho(
                 f"The API returned the next error code: {code} with message: {msg}",
@@ -87,48 +126,61 @@ class SportmonksHandler(object):
             return "", 200
         return error["message"], error["code"]
 
-    def _get_data(self, req, url):
+    def _get_data(self, req, url, params):
         parts = json.loads(req.text)
         data = parts.get("data")
         pagination = parts.get("pagination")
         pages = int(pagination["count"]) if pagination else 1
         if pages > 1:
-            for i in range(2, pages + 1):
-                self.params["page"] = i
-                req = requests.get(SportmonksHandler.BASE_URL + url, params=self.params)
-                if req.status_code != requests.codes.ok or not req.text:
-                    continue
-                next_data = json.loads(req.text).get("data")
+            for next_data in self.session.map(
+                lambda page: self._get_page(url, params, page), range(2, pages + 1)
+            ):
                 if next_data:
                     data.extend(next_data)
-            self.params.pop("page", None)
         return data
 
+    def _get_page(self, url, params, page):
+        """GET a single page with its own params, retrying transient failures."""
+        page_params = dict(params)
+        page_params["page"] = page
+        req = self.session.get_retrying(
+            SportmonksHandler.BASE_URL + url, params=page_params
+        )
+        if req.status_code != requests.codes.ok or not req.text:
+            self._show_request_error(req)
+        msg, code = self._get_error(req)
+        if code != requests.codes.ok:
+            raise APIErrorException(msg)
+        return json.loads(req.text).get("data")
+
     def get_league_ids(self):
-        league_ids = []
-        for x in self.league_data:
-            ids = list(x.values())[0]
-            for league_id in ids:
-                league_ids.extend([league_id])
-        return league_ids
+        return self.league_data.all_ids()
 
     def get_league_abbreviation(self, league_name):
-        for x in self.league_data:
-            abbreviation = list(x.keys())[0]
-            ids = list(x.values())[0]
-            if league_name == abbreviation:
-                return ids
-        return None
-
-    def set_params(self, include_odds=True):
+        return self.league_data.ids(league_name)
+
+    @staticmethod
+    def fixture_params(show_odds=True, show_details=True, show_minute=True):
+        """Return the include and markets params for a fixtures view.
+        Goal events are only needed with --details, periods only to show the
+        minute of live matches and odds only with --odds or --bet."""
+        names = ["participants", "league", "round", "stage", "scores"]
+        if show_details:
+            names.append("events")
+        if show_minute:
+            names.append("periods")
+        if show_odds:
+            names.append("odds")
+        params = {"include": ";".join(names)}
+        if show_odds:
+            params["markets"] = "1"
+        return params
+
+    def set_params(self, show_odds=True, show_details=True, show_minute=True):
         league_ids = self.get_league_ids()
         self.params["leagues"] = ",".join(str(val) for val in league_ids)
-        self.params["include"] = "participants;league;round;events;stage;scores;periods"
-        if include_odds:
-            self.params["include"] += ";odds"
-            self.params["markets"] = "1"
-        else:
-            self.params.pop("markets", None)
+        self.params.pop("markets", None)
+        self.params.update(self.fixture_params(show_odds, show_details, show_minute))
 
     @staticmethod
     def set_start_end(days):
@@ -148,23 +200,31 @@ class SportmonksHandler(object):
         return start, end
 
     def get_matches(self, parameters):
-        self.set_params(include_odds=parameters.show_odds or parameters.place_bet)
+        self.set_params(
+            show_odds=parameters.show_odds or parameters.place_bet,
+            show_details=parameters.show_details,
+            show_minute=parameters.type_sort == "live",
+        )
         if parameters.league_name:
-            if parameters.refresh:
-                while True:
-                    self.get_match_data_for_leagues(parameters)
-                    time.sleep(60)
-            else:
-                self.get_match_data_for_leagues(parameters)
+            get_match_data = self.get_match_data_for_leagues
         else:
-            if parameters.refresh:
-                while True:
-                    self.try_to_get_match_data(parameters)
-                    time.sleep(60)
-            else:
-                self.try_to_get_match_data(parameters)
+            get_match_data = self.try_to_get_match_data
+        if not parameters.refresh:
+            get_match_data(parameters)
+            return
+        scheduler = PollScheduler(self.config_handler)
+        while True:
+            self.writer.start_frame(parameters.place_bet)
+            fixtures = get_match_data(parameters)
+            self.writer.end_frame()
+            delay = scheduler.next_delay(fixtures)
+            if delay is None:
+                click.secho("All matches have finished, stopped refreshing.")
+                return
+            time.sleep(delay)
 
     def get_match_data_for_leagues(self, parameters):
+        fixtures = []
         for i, league in enumerate(parameters.league_name):
             league_id = self.get_league_abbreviation(league)
             if parameters.type_sort == "live":
@@ -173,12 +233,13 @@ class SportmonksHandler(object):
             else:
                 self.params.pop("live", None)
                 self.params["leagues"] = ",".join(str(val) for val in league_id)
-            self.try_to_get_match_data(parameters, i == 0)
+            fixtures.extend(self.try_to_get_match_data(parameters, i == 0))
+        return fixtures
 
     def try_to_get_match_data(self, parameters, first=False):
         start, end = self.set_start_end(parameters.days)
         try:
-            self.get_match_data(parameters, start, end, first)
+            return self.get_match_data(parameters, start, end, first)
         except APIErrorException as e:
             if parameters.show_odds and "not accessible from your plan" in str(e):
                 click.secho(
@@ -186,23 +247,59 @@ class SportmonksHandler(object):
                     fg="yellow",
                     bold=True,
                 )
-                self.params["include"] = self.params["include"].replace(";odds", "")
                 self.params.pop("markets", None)
+                self.params.update(
+                    self.fixture_params(
+                        show_odds=False,
+                        show_details=parameters.show_details,
+                        show_minute=parameters.type_sort == "live",
+                    )
+                )
                 try:
-                    self.get_match_data(parameters, start, end, first)
+                    return self.get_match_data(parameters, start, end, first)
                 except APIErrorException as e2:
                     click.secho(str(e2), fg="red", bold=True)
             else:
                 click.secho(str(e), fg="red", bold=True)
+        return []
+
+    def _fixture_filters(self, statuses):
+        """Return params with the league and status filters of fixtures/between."""
+        params = dict(self.params)
+        filters = []
+        if params.get("leagues"):
+            filters.append(f"fixtureLeagues:{params['leagues']}")
+        if statuses is not None:
+            state_ids = [
+                str(state_id)
+                for state_id, status in convert.STATE_ID_MAP.items()
+                if status in statuses
+            ]
+            filters.append(f"fixtureStates:{','.join(state_ids)}")
+        if filters:
+            params["filters"] = ";".join(filters)
+        return params
 
     def get_match_data(self, parameters, start, end, first=False):
+        statuses = convert.statuses_to_show(
+            parameters.type_sort, parameters.place_bet, parameters.not_started
+        )
+        # A --refresh loop needs the hidden matches as well to know when to
+        # poll again, so they are only filtered out after the download then
+        pushed = None if parameters.refresh else statuses
         if parameters.type_sort == "matches":
-            fixtures_results = self._get(parameters.url + f"{start}/{end}")
+            fixtures_results = self._get_fixtures(
+                parameters.url + f"{start}/{end}", self._fixture_filters(pushed)
+            )
         elif parameters.type_sort == "today":
             today = datetime.datetime.strftime(datetime.datetime.now(), "%Y-%m-%d")
-            fixtures_results = self._get(f"fixtures/between/{today}/{today}")
+            fixtures_results = self._get_fixtures(
+                f"fixtures/between/{today}/{today}", self._fixture_filters(pushed)
+            )
         else:
-            fixtures_results = self._get(parameters.url)
+            fixtures_results = self._get_fixtures(parameters.url)
+        fixtures_results, hidden, dropped = split_shown(fixtures_results, statuses)
+        self.session.discard(fixture.data for fixture in hidden + dropped)
         if not fixtures_results:
             if parameters.type_sort == "matches":
                 if parameters.days < 0:
@@ -219,7 +316,7 @@ class SportmonksHandler(object):
                     )
             else:
                 click.secho(parameters.msg[0], fg="red", bold=True)
-            return
+            return hidden
         bet_matches = self.writer.league_scores(fixtures_results, parameters, first)
         if parameters.place_bet:
             if bet_matches:
@@ -230,6 +327,7 @@ class SportmonksHandler(object):
                     fg="red",
                     bold=True,
                 )
+        return fixtures_results + hidden
 
     def get_standings(self, leagues, show_details):
         self.reset_params()
@@ -250,16 +348,23 @@ class SportmonksHandler(object):
                 except (KeyError, TypeError):
                     pass
 
-    def get_multi_matches(self, match_ids, predictions, parameters):
+    def get_multi_matches(self, match_ids, bets, parameters):
         if not match_ids:
             click.secho(parameters.msg[0], fg="red", bold=True)
             return True
-        self.set_params()
-        fixtures = self._get(f"fixtures/multi/{match_ids}")
+        self.set_params(show_details=parameters.show_details)
+        fixtures, missing = self._get_fixtures_by_ids(match_ids, dict(self.params))
+        if missing:
+            click.secho(
+                f"Could not get the matches with ID {', '.join(missing)}.",
+                fg="red",
+                bold=True,
+            )
         if not fixtures:
             click.secho(parameters.msg[0], fg="red", bold=True)
-            return
-        self.writer.league_scores(fixtures, parameters, True, predictions)
+            return []
+        self.writer.league_scores(fixtures, parameters, True, bets)
+        return fixtures
 
     def place_bet(self, bet_matches):
         match_bet = click.prompt(
@@ -275,7 +380,7 @@ class SportmonksHandler(object):
                     matches.extend([str(bet_matches[int(match_id) - 1])])
                 except (IndexError, ValueError):
                     pass
-            match_data = self.get_match_bet(",".join(matches))
+            match_data = self.get_match_bet(matches)
             match_data = self.check_match_data(match_data)
             if match_data == "no_matches":
                 click.secho("There are no valid matches selected.", fg="red", bold=True)
@@ -283,9 +388,54 @@ class SportmonksHandler(object):
                 self.place_bet_betting(match_data)
 
     def get_match_bet(self, matches):
-        self.params["include"] = "participants;league;round;events;stage;odds"
-        self.params["markets"] = "1"
-        return self._get(f"fixtures/multi/{matches}")
+        """Fetch fixtures by ID with odds, for placing bets, with their own
+        params so the params of the view the bets are placed from are kept.
+        The cache is bypassed, bets are placed on the current status and odds."""
+        params = {
+            "api_token": self.config_handler.get("auth", "api_token"),
+            "tz": self.config_handler.get("profile", "timezone"),
+            "include": "participants;league;odds",
+            "markets": "1",
+        }
+        fixtures, _ = self._get_fixtures_by_ids(matches, params, fresh=True)
+        return fixtures
+
+    def get_match_results(self, match_ids):
+        """Fetch fixtures by ID without odds, for settling open bets, with their
+        own params so this can run next to another request. Returns the
+        fixtures and the IDs whose request failed."""
+        params = {
+            "api_token": self.config_handler.get("auth", "api_token"),
+            "tz": self.config_handler.get("profile", "timezone"),
+            "include": "participants;scores",
+        }
+        failed = []
+        fixtures, _ = self._get_fixtures_by_ids(match_ids, params, failed)
+        return fixtures, failed
+
+    def _get_fixtures_by_ids(self, match_ids, params, failed=None, fresh=False):
+        """Fetch fixtures by ID, in concurrent chunks of at most
+        MAX_IDS_PER_REQUEST IDs. Returns the fixtures in the order of the IDs
+        and the IDs that were not found or whose chunk failed. The IDs of
+        failed chunks are also added to failed, when given. With fresh, cached
+        fixtures are not used."""
+
+        def fetch_chunk(chunk):
+            try:
+                return self._get_fixtures(
+                    f"fixtures/multi/{','.join(chunk)}", params, fresh
+                )
+            except APIErrorException:
+                if failed is not None:
+                    failed.extend(chunk)
+                return []
+
+        return self.session.fetch_by_ids(
+            fetch_chunk,
+            match_ids,
+            SportmonksHandler.MAX_IDS_PER_REQUEST,
+            lambda fixture: fixture.id,
+        )
 
     @staticmethod
     def check_match_bet(match_bet, max_match_id):
@@ -314,9 +464,7 @@ class SportmonksHandler(object):
     def check_match_data(match_data):
         matches = []
         for match in match_data:
-            home = convert.get_home_team(match).get("name", "")
-            away = convert.get_away_team(match).get("name", "")
-            status = convert.state_id_to_status(match.get("state_id"))
+            home, away, status = match.home_name, match.away_name, match.status
             if not match.get("odds"):
                 click.secho(
                     f"The match {home} - {away} doesn't have any odds available (yet).",
@@ -1,6 +1,6 @@
 import click
-import os
-import copy
+import shutil
+import sys
 
 import convert
 
@@ -22,6 +22,9 @@ class BaseWriter(object):
 
 
 class Stdout(BaseWriter):
+    CLEAR_SCREEN = "\x1b[2J\x1b[H"
+    CLEAR_LINE = "\x1b[K"
+    CLEAR_BELOW = "\x1b[J"
 
     def __init__(self, output_file):
         super().__init__(output_file)
@@ -51,6 +54,88 @@ class Stdout(BaseWriter):
 
         self.bet_matches = []
 
+        self.frame = []
+
+        # Live dashboard state for --refresh and --watch-bets
+        self.live = False
+        self.update_time = None
+        self.previous_lines = None
+        self.previous_rows = None
+        self.settled = []
+
+    def secho(self, message, nl=True, **styles):
+        """Add a fragment to the current frame, styled the same way as click.secho"""
+        self.frame.append(click.style(message, **styles))
+        if nl:
+            self.frame.append("\n")
+
+    def echo(self):
+        """Add an empty line to the current frame"""
+        self.frame.append("\n")
+
+    def flush(self):
+        """Write the current frame to the terminal in a single write.
+        In live mode the frame is kept until end_frame() redraws it."""
+        if self.frame and not self.live:
+            click.echo("".join(self.frame), nl=False)
+            self.frame = []
+
+    def start_frame(self, place_bet):
+        """Start the next poll of a --refresh or --watch-bets loop. On a terminal
+        the frame is drawn as a live dashboard, unless bets are placed in between."""
+        self.live = sys.stdout.isatty() and not place_bet
+        self.update_time = datetime.now()
+        self.frame = []
+
+    def settlement_results(self, results):
+        """Add the results of the bets settled during a --watch-bets loop to the
+        frame. The live dashboard keeps showing them on every redraw."""
+        self.settled.extend(results)
+        for result in self.settled if self.live else results:
+            self.secho(result)
+
+    def end_frame(self):
+        """Redraw only the rows of the dashboard that changed since the last
+        poll, using cursor addressing, and mark those rows."""
+        if not self.live:
+            self.flush()
+            return
+        lines = "".join(self.frame).split("\n")
+        if lines[-1] == "":
+            lines.pop()
+        self.frame = []
+        previous_lines = self.previous_lines or []
+        rows = []
+        for i, line in enumerate(lines):
+            changed = self.previous_lines is not None and (
+                i >= len(previous_lines) or previous_lines[i] != line
+            )
+            marker = (
+                click.style("*", fg=self.colors.TIME, bold=True) if changed else " "
+            )
+            rows.append(f"{marker} {line}")
+
+        update_line = click.style(
+            f"Last update: {self.update_time:%d-%m-%Y %H:%M:%S}", fg=self.colors.MISC
+        )
+        if (
+            self.previous_rows is None
+            or len(rows) + 2 > shutil.get_terminal_size().lines
+        ):
+            # first frame, or a frame that doesn't fit on the screen: draw it all
+            output = [Stdout.CLEAR_SCREEN, update_line, "\n"]
+            output.extend(f"{row}\n" for row in rows)
+        else:
+            output = [f"\x1b[1;1H{update_line}{Stdout.CLEAR_LINE}"]
+            for i, row in enumerate(rows):
+                if i >= len(self.previous_rows) or self.previous_rows[i] != row:
+                    output.append(f"\x1b[{i + 2};1H{row}{Stdout.CLEAR_LINE}")
+            # park the cursor below the dashboard and clear what is left there
+            output.append(f"\x1b[{len(rows) + 2};1H{Stdout.CLEAR_BELOW}")
+        click.echo("".join(output), nl=False)
+        self.previous_lines = lines
+        self.previous_rows = rows
+
     @staticmethod
     def show_profile(profile_data):
         """Show the profile data"""
@@ -60,11 +145,16 @@ Your balance: {profile_data['balance']}
 Your timezone: {profile_data['timezone']}""",
             fg="green",
         )
+        if "total_staked" in profile_data:
+            click.secho(
+                f"""Total staked on closed bets: {profile_data['total_staked']}
+Total won on closed bets: {profile_data['total_won']}""",
+                fg="green",
+            )
 
-    @staticmethod
-    def show_leagues(leagues):
-        click.secho("Showing the leagues that are in your Sportmonks API Plan. ")
-        click.secho(
+    def show_leagues(self, leagues):
+        self.secho("Showing the leagues that are in your Sportmonks API Plan. ")
+        self.secho(
             f"{'ID':7} {'NAME':30} {'ABBREVIATION':15} {'LEAGUE NAME':15}", bold=True
         )
         league_data = []
@@ -76,9 +166,21 @@ Your timezone: {profile_data['timezone']}""",
             )
         league_data = sorted(league_data, key=lambda x: (x[2]))
         for league in league_data:
-            click.secho(
+            self.secho(
                 f"{league[0]:<7} {league[1]:<30} {league[2]:<15} {league[3]:<15}"
             )
+        self.flush()
+
+    @staticmethod
+    def show_connection_stats(opened, reused, downloaded, discarded):
+        """Show how many HTTP connections were opened and reused in this run,
+        and how much of the downloaded data was thrown away again"""
+        click.secho(f"HTTP connections: {opened} opened, {reused} reused", fg="yellow")
+        click.secho(
+            f"Downloaded {downloaded / 1024:.1f} kB, of which about "
+            f"{discarded / 1024:.1f} kB was filtered out after downloading",
+            fg="yellow",
+        )
 
     STANDING_TYPE_IDS = {
         129: "games_played",
@@ -122,16 +224,17 @@ Your timezone: {profile_data['timezone']}""",
             else:
                 self.standings_header(league_name, show_details, stage_name)
                 self._print_standings_table(stage_teams, show_details)
+        self.flush()
 
     def _print_standings_table(self, teams, show_details):
         """Prints the standings table rows for a group or stage"""
         if show_details:
-            click.secho(
+            self.secho(
                 f"{'POS':6}  {'CLUB':25}    {'PLAYED':8}    {'WON':8}    {'DRAW':8}    {'LOST':8}    "
                 f"{'GOALS':8}    {'GOAL DIFF':8}    {'POINTS':8}"
             )
         else:
-            click.secho(
+            self.secho(
                 f"{'POS':6}  {'CLUB':25}    {'PLAYED':8}    {'GOAL DIFF':6}    {'POINTS':8}"
             )
         number_of_teams = len(teams)
@@ -166,102 +269,92 @@ Your timezone: {profile_data['timezone']}""",
                 )
             positions = self.color_position(result, team_str, positions)
             if i + 1 == number_of_teams:
-                click.echo()
+                self.echo()
         positions = self.remove_duplicates(positions)
         self.print_colors(positions)
 
     def color_position(self, result, team_str, positions):
         """Based on the result, color the position"""
         if result is None:
-            click.secho(team_str, fg=self.colors.POSITION)
+            self.secho(team_str, fg=self.colors.POSITION)
         elif "Champions League" in result or result == "Promotion":
             if result == "Promotion":
                 positions.append(("promotion", self.colors.CL_POSITION))
             elif "Champions League" in result:
                 positions.append(("CL (play-offs)", self.colors.CL_POSITION))
-            click.secho(team_str, bold=True, fg=self.colors.CL_POSITION)
+            self.secho(team_str, bold=True, fg=self.colors.CL_POSITION)
         elif "Europa League" in result or result == "Promotion Play-off":
             if result == "Promotion Play-off":
                 positions.append(("promotion (play-offs)", self.colors.EL_POSITION))
             elif "Europa League" in result:
                 positions.append(("EL (play-offs)", self.colors.EL_POSITION))
-            click.secho(team_str, fg=self.colors.EL_POSITION)
+            self.secho(team_str, fg=self.colors.EL_POSITION)
         elif "Relegation" in result:
             positions.append(("relegation (play-offs)", self.colors.RL_POSITION))
-            click.secho(team_str, fg=self.colors.RL_POSITION)
+            self.secho(team_str, fg=self.colors.RL_POSITION)
         else:
-            click.secho(team_str, fg=self.colors.POSITION)
+            self.secho(team_str, fg=self.colors.POSITION)
         return positions
 
-    @staticmethod
-    def print_colors(positions):
+    def print_colors(self, positions):
         """Print the color which explains the corresponding position"""
         for position in positions:
             try:
-                click.secho(f"This color is {position[0]} position", fg=position[1])
+                self.secho(f"This color is {position[0]} position", fg=position[1])
             except IndexError:
                 pass
 
-    def league_scores(self, total_data, parameters, first=False, predictions=[]):
-        """Prints the data in a pretty format"""
-        if parameters.refresh and first:
-            os.system("cls" if os.name == "nt" else "clear")
+    def league_scores(self, total_data, parameters, first=False, bets=None):
+        """Prints the data in a pretty format. bets maps a match id to the bets
+        placed on that match"""
+        if parameters.refresh and first and not self.live:
+            if sys.stdout.isatty():
+                self.frame.append(Stdout.CLEAR_SCREEN)
             self.show_update_time()
         self.score_id = 1
         self.bet_matches = []
         if parameters.sort_by == "date":
             scores = sorted(
                 total_data,
-                key=lambda x: (x["starting_at_timestamp"], x["league_id"]),
+                key=lambda x: (x.kickoff, x.league_id),
             )
         else:
             scores = sorted(
                 total_data,
-                key=lambda x: (x["league"]["country_id"], x["league_id"]),
+                key=lambda x: (x["league"]["country_id"], x.league_id),
             )
-        for league_id, games in groupby(scores, key=lambda x: x["league_id"]):
+        for league_id, games in groupby(scores, key=lambda x: x.league_id):
             league = convert.league_id_to_league_name(league_id)
-            league_abbrev = convert.league_id_to_league_abbreviation(league_id)
-            games = sorted(games, key=lambda x: x["starting_at_timestamp"])
             if league == "":
                 continue
-            games_copy = copy.deepcopy(games)
-            league_prefix = list(set([x["league"]["name"] for x in games_copy]))
-            match_status = set(
-                [convert.state_id_to_status(x["state_id"]) for x in games_copy]
-            )
+            league_abbrev = convert.league_id_to_league_abbreviation(league_id)
+            games = sorted(games, key=lambda x: x.kickoff)
+            league_prefix = games[0]["league"]["name"]
+            match_status = {x.status for x in games}
             skip_league = self.get_skip_league(match_status, parameters)
             if skip_league or (parameters.not_started and "NS" not in match_status):
                 continue
-            if league_prefix[0] == league:
+            if league_prefix == league:
                 self.league_header(
                     " - ".join([league, league_abbrev]), parameters.place_bet
                 )
             else:
                 self.league_header(
-                    " - ".join([league, league_abbrev, league_prefix[0]]),
+                    " - ".join([league, league_abbrev, league_prefix]),
                     parameters.place_bet,
                 )
-            games = self.group_games(games, games_copy)
-            self.print_matches(games, parameters, predictions)
+            games = self.group_games(games)
+            self.print_matches(games, parameters, bets)
+        self.flush()
         return self.bet_matches
 
-    def group_games(self, games, games_copy):
+    def group_games(self, games):
         """Group the games based on round or stage"""
-        keys = [list(key.keys()) for key in games_copy]
-        uniq_keys = set()
-        for key in keys:
-            uniq_keys.update(key)
-        if "round" in uniq_keys:
-            if self.groupby_round(games_copy):
-                games = groupby(games, key=lambda x: x["round"]["name"])
-            else:
-                games = groupby(games, key=lambda x: x["stage"]["name"])
-        else:
-            games = groupby(games, key=lambda x: x["stage"]["name"])
-        return games
+        if any("round" in game for game in games) and self.groupby_round(games):
+            return groupby(games, key=lambda x: x["round"]["name"])
+        return groupby(games, key=lambda x: x["stage"]["name"])
 
-    def print_matches(self, games, parameters, predictions):
+    def print_matches(self, games, parameters, bets):
         """Print the matches"""
         skip_match_statuses = self.get_match_statuses_to_skip(
             parameters.type_sort, parameters.place_bet
@@ -272,46 +365,43 @@ Your timezone: {profile_data['timezone']}""",
             else:
                 self.league_subheader(matchday, "stage", parameters.place_bet)
             for match in matches:
-                if (
-                    parameters.not_started
-                    and convert.state_id_to_status(match.get("state_id")) != "NS"
-                ):
+                if parameters.not_started and match.status != "NS":
                     continue
-                if predictions:
-                    prediction = ""
-                    for pred in predictions:
-                        parts = pred.split(";")
-                        match_id = parts[0]
-                        if int(match_id) == match["id"]:
-                            prediction = parts[1]
-                    self.print_match(match, parameters, skip_match_statuses, prediction)
+                if bets:
+                    self.print_match(
+                        match, parameters, skip_match_statuses, bets.get(match.id, [])
+                    )
                 else:
                     self.print_match(match, parameters, skip_match_statuses)
 
-    def print_match(self, match, parameters, skip_match_statuses, prediction=""):
+    def print_match(self, match, parameters, skip_match_statuses, bets=()):
         """Print match and all other match-details"""
-        if convert.state_id_to_status(match.get("state_id")) in skip_match_statuses:
+        if match.status in skip_match_statuses:
             return
         if parameters.show_odds:
-            self.print_odds(match, parameters.place_bet, prediction)
+            self.print_odds(
+                match, parameters.place_bet, {bet["prediction"] for bet in bets}
+            )
         if parameters.place_bet:
             self.bet_matches.extend([match["id"]])
         self.scores(
             self.parse_result(match),
             parameters.place_bet,
-            convert.state_id_to_status(match.get("state_id")),
+            match.status,
         )
         if parameters.type_sort != "matches":
             self.print_datetime_status(match, parameters)
         else:
             self.print_datetime_status_matches(match, parameters)
+        if bets:
+            self.print_bets(match, bets)
         if parameters.show_details:
             self.print_details(match)
-        click.echo()
+        self.echo()
 
     def show_update_time(self):
         """Prints the time at which the data was updated"""
-        click.secho(
+        self.secho(
             f"Last update: {datetime.now():%d-%m-%Y %H:%M:%S}", fg=self.colors.MISC
         )
 
@@ -319,9 +409,9 @@ Your timezone: {profile_data['timezone']}""",
         """Prints the league header"""
         league_name = f" {league} "
         if place_bet:
-            click.secho(f"===={league_name:=^62}", fg=self.colors.MISC)
+            self.secho(f"===={league_name:=^62}", fg=self.colors.MISC)
         else:
-            click.secho(f"{league_name:=^62}", fg=self.colors.MISC)
+            self.secho(f"{league_name:=^62}", fg=self.colors.MISC)
 
     def standings_header(self, league, details, prefix=None):
         """Prints the league header"""
@@ -330,10 +420,10 @@ Your timezone: {profile_data['timezone']}""",
         else:
             league_name = f" {league} "
         if details:
-            click.secho(f"{league_name:#^138}", fg=self.colors.MISC)
+            self.secho(f"{league_name:#^138}", fg=self.colors.MISC)
         else:
-            click.secho(f"{league_name:#^73}", fg=self.colors.MISC)
-        click.echo()
+            self.secho(f"{league_name:#^73}", fg=self.colors.MISC)
+        self.echo()
 
     def league_subheader(self, subheader, type_header, place_bet):
         """Prints the league matchday"""
@@ -342,10 +432,10 @@ Your timezone: {profile_data['timezone']}""",
         else:
             league_subheader = " {0} ".format(subheader)
         if place_bet:
-            click.secho(f"----{league_subheader:-^62}", fg=self.colors.MISC)
+            self.secho(f"----{league_subheader:-^62}", fg=self.colors.MISC)
         else:
-            click.secho(f"{league_subheader:-^62}", fg=self.colors.MISC)
-        click.echo()
+            self.secho(f"{league_subheader:-^62}", fg=self.colors.MISC)
+        self.echo()
 
     def scores(self, result, place_bet, status=""):
         """Prints out the scores in a pretty format"""
@@ -365,26 +455,26 @@ Your timezone: {profile_data['timezone']}""",
 
         if place_bet:
             if self.score_id < 10:
-                click.secho(f"{self.score_id}.  ", nl=False)
+                self.secho(f"{self.score_id}.  ", nl=False)
             else:
-                click.secho(f"{self.score_id}. ", nl=False)
+                self.secho(f"{self.score_id}. ", nl=False)
             self.score_id += 1
 
-        click.secho(
+        self.secho(
             f"{result.home_team:{25}} {result.goals_home_team:>2}",
             fg=home_color,
             bold=home_color == self.colors.WIN,
             nl=False,
         )
-        click.secho("  vs ", nl=False)
-        click.secho(
+        self.secho("  vs ", nl=False)
+        self.secho(
             f"{result.goals_away_team:>2} {result.away_team.rjust(26)}",
             fg=away_color,
             bold=away_color == self.colors.WIN,
             nl=False,
         )
 
-    def print_odds(self, match, place_bet, prediction):
+    def print_odds(self, match, place_bet, predictions):
         """Print the odds"""
         odds_dict = {"1": [], "X": [], "2": []}
 
@@ -392,16 +482,10 @@ Your timezone: {profile_data['timezone']}""",
             odds_dict = self.fill_odds(odd, odds_dict)
         if not any(odds_dict.values()):
             return
-        status = convert.state_id_to_status(match.get("state_id"))
         self.odds(
-            self.parse_odd(
-                odds_dict,
-                convert.get_current_score(match, "home"),
-                convert.get_current_score(match, "away"),
-                status,
-            ),
+            self.parse_odd(odds_dict, match.home_goals, match.away_goals, match.status),
             place_bet,
-            prediction,
+            predictions,
         )
 
     @staticmethod
@@ -425,17 +509,17 @@ Your timezone: {profile_data['timezone']}""",
 
     def print_datetime_status(self, match, parameters):
         """Prints the date/time in a pretty format based on the match status"""
-        status = convert.state_id_to_status(match.get("state_id"))
+        status = match.status
         if status in ["LIVE", "HT", "ET", "PEN_LIVE", "AET", "BREAK"]:
             minute, extra_minute = self._get_match_minute(match)
             if status == "HT":
-                click.secho("   HT", fg=self.colors.TIME)
+                self.secho("   HT", fg=self.colors.TIME)
             elif minute is None and extra_minute in [0, None]:
-                click.secho("   0'", fg=self.colors.TIME)
+                self.secho("   0'", fg=self.colors.TIME)
             elif extra_minute in [0, None]:
-                click.secho(f"   {minute}'", fg=self.colors.TIME)
+                self.secho(f"   {minute}'", fg=self.colors.TIME)
             else:
-                click.secho(f"   {minute}+{extra_minute}'", fg=self.colors.TIME)
+                self.secho(f"   {minute}+{extra_minute}'", fg=self.colors.TIME)
         elif status in [
             "FT",
             "FT_PEN",
@@ -452,24 +536,24 @@ Your timezone: {profile_data['timezone']}""",
             "AU",
         ]:
             if parameters.type_sort == "live" or parameters.type_sort == "watch_bets":
-                click.secho(
+                self.secho(
                     f"   {convert.datetime(match.get('starting_at', ''), parameters.date_format)} "
                     f"{status}",
                     fg=self.colors.TIME,
                 )
             elif parameters.type_sort == "today":
                 time_str = match.get("starting_at", "")[11:19]
-                click.secho(
+                self.secho(
                     f"   {convert.time(time_str)} {status}",
                     fg=self.colors.TIME,
                 )
 
     def print_datetime_status_matches(self, match, parameters):
         """Prints the date/time in a pretty format based on the match status"""
-        status = convert.state_id_to_status(match.get("state_id"))
+        status = match.status
         starting_at = match.get("starting_at", "")
         if status in ["FT", "FT_PEN", "AET", "ET", "TBA"]:
-            click.secho(
+            self.secho(
                 f"   {convert.date(starting_at[:10], parameters.date_format)} {status}",
                 fg=self.colors.TIME,
             )
@@ -485,15 +569,45 @@ Your timezone: {profile_data['timezone']}""",
             "WO",
             "AU",
         ]:
-            click.secho(
+            self.secho(
                 f"   {convert.datetime(starting_at, parameters.date_format)} {status}",
                 fg=self.colors.TIME,
             )
 
+    def print_bets(self, match, bets):
+        """Prints every bet on the match with its profit or loss. Settled bets
+        show their payout, open bets what they would pay out if the match
+        ended with the current score"""
+        winning_team = self.calculate_winning_team(
+            match.home_goals, match.away_goals, match.status
+        )
+        for bet in bets:
+            if "payout" in bet.keys():
+                profit = bet["payout"] - bet["stake"]
+            elif winning_team == "no_winner_yet":
+                profit = None
+            elif winning_team == bet["prediction"]:
+                profit = bet["potential_wins"] - bet["stake"]
+            else:
+                profit = -bet["stake"]
+            line = (
+                f"   Bet {bet['prediction']} @ {bet['odd']}: "
+                f"stake {convert.cents_to_currency(bet['stake'])}, "
+                f"to win {convert.cents_to_currency(bet['potential_wins'])}"
+            )
+            if profit is None:
+                self.secho(line, fg=self.colors.TIME)
+            else:
+                sign = "+" if profit >= 0 else ""
+                self.secho(
+                    f"{line}, {sign}{convert.cents_to_currency(profit)}",
+                    fg=self.colors.WIN if profit >= 0 else self.colors.LOSE,
+                )
+
     def print_details(self, match):
         """Prints the match details in a pretty format"""
         goals = []
-        home_team_id = convert.get_home_team(match).get("id")
+        home_team_id = match.home_id
         for event in sorted(match.get("events", []), key=lambda x: x["id"]):
             event_type = convert.GOAL_TYPE_IDS.get(event.get("type_id"))
             if event_type and event.get("minute") is not None:
@@ -517,13 +631,11 @@ Your timezone: {profile_data['timezone']}""",
         events["home"] = self.merge_duplicate_keys(events["home"])
         events["away"] = self.merge_duplicate_keys(events["away"])
         goals = convert.events_to_pretty_goals(
-            events,
-            convert.get_current_score(match, "home"),
-            convert.get_current_score(match, "away"),
+            events, match.home_goals, match.away_goals
         )
         self.goals(goals)
 
-    def odds(self, odds, place_bet, prediction=False):
+    def odds(self, odds, place_bet, predictions=()):
         """Prints the odds in a pretty format"""
         if odds.winning_odd == "1":
             home_color, draw_color, away_color = (
@@ -552,23 +664,23 @@ Your timezone: {profile_data['timezone']}""",
         x = 28
         if place_bet:
             x = 32
-        click.secho(
+        self.secho(
             "{}".format(odds.odd_home_team.rjust(x)),
             fg=home_color,
             nl=False,
-            bold=prediction == "1",
+            bold="1" in predictions,
         )
-        click.secho(
+        self.secho(
             " {} ".format(odds.odd_draw),
             fg=draw_color,
             nl=False,
-            bold=prediction == "X",
+            bold="X" in predictions,
         )
-        click.secho(
+        self.secho(
             "{}".format(odds.odd_away_team),
             fg=away_color,
             nl=True,
-            bold=prediction == "2",
+            bold="2" in predictions,
         )
 
     @staticmethod
@@ -681,12 +793,11 @@ Your timezone: {profile_data['timezone']}""",
                 goals.extend(["{}".format(str_scorer.rjust(62))])
         return goals
 
-    @staticmethod
-    def goals(goals):
+    def goals(self, goals):
         """ "Prints the goals in a pretty format"""
         try:
             for goal in goals:
-                click.secho(goal)
+                self.secho(goal)
         except TypeError:
             pass
 
@@ -697,12 +808,11 @@ Your timezone: {profile_data['timezone']}""",
             """If the status is NS or TBA, return "-", else return the score"""
             return "-" if status in ["NS", "TBA"] else score
 
-        status = convert.state_id_to_status(data.get("state_id"))
         result = self.Result(
-            convert.get_home_team(data).get("name", ""),
-            match_status(status, convert.get_current_score(data, "home")),
-            convert.get_away_team(data).get("name", ""),
-            match_status(status, convert.get_current_score(data, "away")),
+            data.home_name,
+            match_status(data.status, data.home_goals),
+            data.away_name,
+            match_status(data.status, data.away_goals),
         )
 
         return result